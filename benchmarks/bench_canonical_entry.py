@@ -0,0 +1,83 @@
+"""
+Check that the canonical entry serializer is byte-identical to the
+reference json.dumps form (which the analyzer's computeEntryHash mirrors),
+then compare their speed.
+
+Run from the repository root:
+
+    blender --background --factory-startup --python benchmarks/bench_canonical_entry.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_log_compression import synthetic_logs  # noqa: E402
+from majik_blender_edu_teacher.core.canonical import (  # noqa: E402
+    canonical_entry_bytes,
+    reference_entry_bytes,
+)
+
+
+def edge_entries() -> list:
+    base = {
+        "t": 1767225600.125,
+        "a": "Edited Mesh",
+        "o": "Cube",
+        "ot": "MESH",
+        "d": {},
+        "dt": 0.0,
+        "s": {"v": 8, "f": 6, "o": 1},
+        "ph": "0" * 64,
+    }
+    variants = [
+        {"o": 'Quote " and \\ backslash'},
+        {"o": "Würfel 立方体 🧊"},
+        {"a": "Tab\tNewline\nNull\x00"},
+        {"t": 1767225600, "dt": -0.0},
+        {"t": 1e-07, "dt": 1e20},
+        {"t": float("nan")},
+        {"t": float("inf")},
+        {"s": {"v": 2**70, "f": -1, "o": 0}},
+        {"s": {"v": True, "f": 6, "o": 1}},
+        {"s": {"o": 1, "f": 6, "v": 8}},
+        {"d": {"z": [1, 2.5, None], "a": {"y": "ü", "b": False}}},
+        {"lu": 1.5},
+    ]
+    entries = [dict(base)]
+    for change in variants:
+        entry = dict(base)
+        entry.update(change)
+        entries.append(entry)
+
+    reordered = {key: base[key] for key in reversed(list(base))}
+    missing = dict(base)
+    del missing["ph"]
+    return entries + [reordered, missing]
+
+
+def main() -> None:
+    logs = synthetic_logs(50000)
+
+    for entry in edge_entries() + logs:
+        expected = reference_entry_bytes(entry)
+        actual = canonical_entry_bytes(entry)
+        assert actual == expected, (entry, actual, expected)
+    print(f"Canonical bytes identical for {len(logs) + len(edge_entries())} entries")
+
+    for label, serialize in (
+        ("json.dumps (reference)", reference_entry_bytes),
+        ("canonical fast path", canonical_entry_bytes),
+    ):
+        start = time.perf_counter()
+        for entry in logs:
+            serialize(entry)
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<24} {elapsed * 1000:9.2f} ms  ({elapsed / len(logs) * 1e6:.2f} us/entry)")
+
+
+if __name__ == "__main__":
+    main()
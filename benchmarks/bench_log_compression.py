@@ -0,0 +1,130 @@
+"""
+Compare session log segment compression: the previous fixed zlib level 5
+JSON path against zlib with and without the preset dictionary at several
+levels, for JSON and compact binary payloads.
+
+Run from the repository root:
+
+    blender --background --factory-startup --python benchmarks/bench_log_compression.py
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import hashlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from majik_blender_edu_teacher.core.text.log_segments import (  # noqa: E402
+    compress_payload,
+    decompress_payload,
+    serialize_entries,
+)
+
+
+ACTIONS = [
+    ("Edited Mesh", "MESH"),
+    ("Transformed Object (Location)", "MESH"),
+    ("Transformed Object (Rotation)", "MESH"),
+    ("Transformed Object (Scale)", "MESH"),
+    ("Operator: MESH_OT_extrude_region_move", "MESH"),
+    ("Added Modifier: Subdivision", "MESH"),
+    ("Added Material: Material.001", "MESH"),
+    ("File Saved", "SYSTEM"),
+]
+OBJECTS = ["Cube", "Cube.001", "Plane", "Sphere", "Cylinder", "Torus", "Suzanne"]
+
+
+def synthetic_logs(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    t = 1767225600.0
+    verts = 8
+    logs = []
+    prev = hashlib.sha256(b"genesis").hexdigest()
+
+    for _ in range(count):
+        action, object_type = rng.choice(ACTIONS)
+        t = round(t + rng.uniform(0.2, 30.0), 3)
+        verts += rng.randint(0, 40)
+        details = {"filepath": "C:/Users/student/project.blend"} if action == "File Saved" else {}
+        entry = {
+            "t": t,
+            "a": action,
+            "o": "__SYSTEM__" if object_type == "SYSTEM" else rng.choice(OBJECTS),
+            "ot": object_type,
+            "d": details,
+            "dt": round(rng.uniform(0.0, 20.0), 3),
+            "s": {"v": verts, "f": verts - 2, "o": rng.randint(1, 12)},
+            "ph": prev,
+        }
+        prev = hashlib.sha256(json.dumps(entry, sort_keys=True).encode()).hexdigest()
+        logs.append(entry)
+
+    return logs
+
+
+def previous_path(serialized: bytes):
+    return "z", zlib.compress(serialized, level=5)
+
+
+def measure(label: str, compress, payloads, repeat: int) -> None:
+    size = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        size = 0
+        for data in payloads:
+            codec, blob = compress(data)
+            size += len(blob)
+            assert decompress_payload(codec, blob) == data
+    elapsed = (time.perf_counter() - start) / repeat
+    raw = sum(len(p) for p in payloads)
+    print(
+        f"  {label:<24} {size:>10} bytes  ratio {size / raw:6.3f}  {elapsed * 1000:9.2f} ms"
+    )
+
+
+def main() -> None:
+    logs = synthetic_logs(20000)
+
+    for segment_size in (1, 10, 100, 20000):
+        segments = [
+            logs[i : i + segment_size]
+            for i in range(0, min(len(logs), 2000 * segment_size), segment_size)
+        ]
+        repeat = 3 if segment_size < 20000 else 5
+
+        for binary in (False, True):
+            start = time.perf_counter()
+            payloads = [serialize_entries(seg, binary=binary) for seg in segments]
+            encode_ms = (time.perf_counter() - start) * 1000
+            print(
+                f"\n{len(payloads)} segments of {segment_size} entries, "
+                f"{'binary' if binary else 'JSON'} ({sum(map(len, payloads))} raw bytes, "
+                f"encoded in {encode_ms:.2f} ms)"
+            )
+
+            if not binary:
+                measure("zlib level 5 (previous)", previous_path, payloads, repeat)
+
+            for level in (1, 6, 9):
+                measure(
+                    f"no dictionary level {level}",
+                    lambda data, level=level: compress_payload(
+                        data, level=level, use_dictionary=False
+                    ),
+                    payloads,
+                    repeat,
+                )
+                measure(
+                    f"dictionary level {level}",
+                    lambda data, level=level: compress_payload(data, level=level),
+                    payloads,
+                    repeat,
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Compare the v1 geometry hash (per-element tuples serialized to JSON)
+against the v2 hash (foreach_get buffers) on a large locked mesh.
+
+Run from the repository root:
+
+    blender --background --factory-startup --python benchmarks/bench_object_hash.py
+"""
+
+import os
+import sys
+import time
+
+import bpy  # type: ignore
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from majik_blender_edu_teacher.core.hash import (  # noqa: E402
+    OBJECT_HASH_V1,
+    OBJECT_HASH_V2,
+    compute_object_hash,
+)
+
+
+GRID_SUBDIVISIONS = 707  # ~500k vertices
+
+
+def main() -> None:
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    bpy.ops.mesh.primitive_grid_add(
+        x_subdivisions=GRID_SUBDIVISIONS, y_subdivisions=GRID_SUBDIVISIONS
+    )
+    obj = bpy.context.active_object
+    print(f"{len(obj.data.vertices):,} vertices, {len(obj.data.polygons):,} faces")
+
+    for label, version in (("v1 (JSON tuples)", OBJECT_HASH_V1), ("v2 (buffers)", OBJECT_HASH_V2)):
+        start = time.perf_counter()
+        digest = compute_object_hash(obj, version)
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<18} {elapsed * 1000:10.2f} ms  {digest[:16]}")
+
+    # v2 must be stable and sensitive to a single coordinate
+    before = compute_object_hash(obj, OBJECT_HASH_V2)
+    assert compute_object_hash(obj, OBJECT_HASH_V2) == before
+    obj.data.vertices[0].co.z += 1e-4
+    assert compute_object_hash(obj, OBJECT_HASH_V2) != before
+
+
+if __name__ == "__main__":
+    main()
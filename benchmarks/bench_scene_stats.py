@@ -0,0 +1,105 @@
+"""
+Compare reading scene stats by regex-parsing the scene.statistics() UI
+string (the previous path) against the structured provider, which reads
+counts from the evaluated meshes and the mode from context.mode. The
+provider is timed through get_stats_manager(), the path the add-on's
+logging.get_scene_stats uses.
+
+Run from the repository root:
+
+    blender --background --factory-startup --python benchmarks/bench_scene_stats.py
+"""
+
+import os
+import re
+import sys
+import time
+
+import bpy  # type: ignore
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from majik_blender_edu_teacher.core.scene_stats import (  # noqa: E402
+    get_stats_manager,
+    reset_stats_engine,
+)
+
+
+OBJECT_COUNTS = [100, 1000, 5000]
+READS = 200
+
+
+def string_stats(scene) -> dict:
+    """The previous path: build the UI string and parse it."""
+    stats_str = scene.statistics(bpy.context.view_layer)
+    parts = [p.strip() for p in stats_str.split("|")]
+    if len(parts) == 2 or "Bones" in stats_str:
+        return {}
+
+    def denominator(pattern: str) -> int:
+        match = re.search(pattern, stats_str)
+        if not match:
+            return 0
+        val = match.group(1).replace(",", "")
+        return int(val.split("/")[1]) if "/" in val else int(val)
+
+    return {
+        "v": denominator(r"Verts:([\d/,]+)"),
+        "f": denominator(r"Faces:([\d/,]+)"),
+        "o": denominator(r"Objects:([\d/,]+)"),
+    }
+
+
+def build_scene(count: int):
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    scene = bpy.context.scene
+
+    # Non-mesh objects count towards Objects but not Verts/Faces
+    bpy.ops.object.camera_add()
+    bpy.ops.object.light_add(type="POINT")
+
+    bpy.ops.mesh.primitive_uv_sphere_add(segments=32, ring_count=16)
+    sphere = bpy.context.active_object
+    mesh = sphere.data
+
+    for i in range(count - 3):
+        obj = bpy.data.objects.new(f"Bench.{i:05d}", mesh)
+        obj.location = (i % 100, i // 100, 0)
+        scene.collection.objects.link(obj)
+
+    bpy.context.view_layer.update()
+    return scene
+
+
+def timed(label: str, func, reads: int) -> dict:
+    start = time.perf_counter()
+    for _ in range(reads):
+        result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed / reads * 1000:9.3f} ms/read")
+    return result
+
+
+def main() -> None:
+    for count in OBJECT_COUNTS:
+        scene = build_scene(count)
+        print(f"{count} objects ({bpy.context.mode})")
+
+        expected = timed("statistics() + regex", lambda: string_stats(scene), READS)
+
+        manager = get_stats_manager()
+
+        reset_stats_engine()
+        cold = timed("provider, cold cache", lambda: manager.get_scene_stats(scene), 1)
+        warm = timed("provider, warm cache", lambda: manager.get_scene_stats(scene), READS)
+
+        assert cold == warm, (cold, warm)
+        assert (warm["v"], warm["f"], warm["o"]) == (
+            expected["v"],
+            expected["f"],
+            expected["o"],
+        ), (warm, expected)
+
+
+if __name__ == "__main__":
+    main()
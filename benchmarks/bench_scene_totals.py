@@ -0,0 +1,104 @@
+"""
+Compare scene totals computed with a temporary evaluated mesh per object
+(the previous to_mesh() path) against the stats engine, which reads the
+counts from the mesh the depsgraph has already evaluated and counts
+shared, unmodified meshes once.
+
+The scene has heavy subdivision stacks (several million faces) plus many
+linked duplicates of one mesh. Run from the repository root:
+
+    blender --background --factory-startup --python benchmarks/bench_scene_totals.py
+"""
+
+import os
+import sys
+import time
+
+import bpy  # type: ignore
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from majik_blender_edu_teacher.core.scene_stats import (  # noqa: E402
+    get_stats_engine,
+    reset_stats_engine,
+)
+
+
+SUBDIVIDED_OBJECTS = 64
+SUBDIVISION_LEVELS = 4  # 512 faces * 4^4 = 131072 faces per object
+LINKED_DUPLICATES = 2000
+REPEATS = 5
+
+
+def build_scene():
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    scene = bpy.context.scene
+
+    bpy.ops.mesh.primitive_uv_sphere_add(segments=32, ring_count=16)
+    sphere = bpy.context.active_object
+
+    for i in range(SUBDIVIDED_OBJECTS):
+        obj = bpy.data.objects.new(f"Subdivided.{i:03d}", sphere.data.copy())
+        obj.location = (i % 8 * 3, i // 8 * 3, 0)
+        modifier = obj.modifiers.new("Subdivision", "SUBSURF")
+        modifier.levels = SUBDIVISION_LEVELS
+        scene.collection.objects.link(obj)
+
+    for i in range(LINKED_DUPLICATES):
+        obj = bpy.data.objects.new(f"Linked.{i:04d}", sphere.data)
+        obj.location = (i % 50 * 3, i // 50 * 3, 10)
+        scene.collection.objects.link(obj)
+
+    bpy.context.view_layer.update()
+    return scene
+
+
+def to_mesh_totals(scene) -> dict:
+    """The previous path: a temporary evaluated mesh per object."""
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    totals = {"v": 0, "f": 0, "o": 0}
+
+    for obj in scene.objects:
+        totals["o"] += 1
+        if obj.type != "MESH":
+            continue
+
+        eval_obj = obj.evaluated_get(depsgraph)
+        eval_mesh = eval_obj.to_mesh(preserve_all_data_layers=False, depsgraph=depsgraph)
+        if eval_mesh:
+            totals["v"] += len(eval_mesh.vertices)
+            totals["f"] += len(eval_mesh.polygons)
+            eval_obj.to_mesh_clear()
+
+    return totals
+
+
+def engine_totals(scene) -> dict:
+    reset_stats_engine()
+    return get_stats_engine().stats(scene)
+
+
+def timed(label: str, func, repeats: int) -> dict:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<28} {best * 1000:10.2f} ms")
+    return result
+
+
+def main() -> None:
+    scene = build_scene()
+    print(f"{len(scene.objects)} objects")
+
+    expected = timed("to_mesh() per object", lambda: to_mesh_totals(scene), REPEATS)
+    cold = timed("engine, cold cache", lambda: engine_totals(scene), REPEATS)
+    warm = timed("engine, warm cache", lambda: get_stats_engine().stats(scene), REPEATS)
+
+    assert cold == warm == expected, (cold, warm, expected)
+    print(f"  {expected['f']:,} faces, {expected['v']:,} vertices")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Generate the preset zlib dictionary for session log segments.
+
+Encodes representative logs (the synthetic logs of bench_log_compression.py,
+with another seed) into binary payloads of SEGMENT_SIZE entries, the way
+segments are written, and builds the dictionary from them with
+build_log_dictionary(). Prints the dictionary as base64 for log_dictionary.py
+and whether it matches the shipped LOG_ZDICT_V2.
+
+Run from the repository root:
+
+    blender --background --factory-startup --python benchmarks/build_log_dictionary.py
+"""
+
+import os
+import sys
+import base64
+import textwrap
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_log_compression import synthetic_logs  # noqa: E402
+from majik_blender_edu_teacher.core.text.log_dictionary import (  # noqa: E402
+    LOG_ZDICT_V2,
+    build_log_dictionary,
+)
+from majik_blender_edu_teacher.core.text.log_segments import (  # noqa: E402
+    serialize_entries,
+)
+
+
+SAMPLE_ENTRIES = 2000
+SAMPLE_SEED = 1  # the benchmark measures seed 7
+SEGMENT_SIZE = 10
+DICTIONARY_SIZE = 4096
+
+
+def main() -> None:
+    logs = synthetic_logs(SAMPLE_ENTRIES, seed=SAMPLE_SEED)
+    payloads = [
+        serialize_entries(logs[i : i + SEGMENT_SIZE], binary=True)
+        for i in range(0, len(logs), SEGMENT_SIZE)
+    ]
+    dictionary = build_log_dictionary(payloads, DICTIONARY_SIZE)
+
+    encoded = base64.b64encode(dictionary).decode("ascii")
+    print(f"{len(dictionary)} bytes")
+    for line in textwrap.wrap(encoded, 76):
+        print(f'    "{line}"')
+    print(f"matches LOG_ZDICT_V2: {dictionary == LOG_ZDICT_V2}")
+
+
+if __name__ == "__main__":
+    main()
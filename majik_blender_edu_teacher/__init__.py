@@ -18,21 +18,26 @@ import bpy  # type: ignore
 
 def restore_logs_on_start():
 
-    from .core.recovery import Recovery
+    from .core.recovery import adopt_pending_project_id, get_recovery
+    from .core.logging import load_logs_from_scene
     from .core.constants import SCENE_SIGNATURE_MODE
 
-    if runtime._runtime_logs_raw:
-        return  # Already loaded
     scene = bpy.context.scene
 
     if scene is None:
         print("[Recovery] No active scene; skipping log restore")
         return
 
+    if not runtime._runtime_logs_raw:
+        # The journal only replays what the scene's log is missing
+        load_logs_from_scene(scene)
+
     try:
         secMode = scene.get(SCENE_SIGNATURE_MODE, "AES")
-        recovery_instance = Recovery()
-        restored = recovery_instance.restore(scene=scene, mode=secMode)
+        # A session that crashed before saving left its id in the pending index
+        adopt_pending_project_id(scene)
+        recovery = get_recovery(scene)
+        restored = recovery.restore(scene=scene, mode=secMode) if recovery else None
         if restored:
             print(f"[Recovery] Restored {len(restored)} logs from previous session")
         else:
@@ -64,6 +69,7 @@ from .ui import *
 from .core.logging import register_logging_handlers, unregister_logging_handlers
 
 from .core import runtime
+from .core.log_store import LogStore
 
 
 
@@ -96,7 +102,7 @@ classes = [
 def register():
     # Ensure runtime logs exist
     if not hasattr(runtime, "_runtime_logs_raw"):
-        runtime._runtime_logs_raw = []
+        runtime._runtime_logs_raw = LogStore()
 
     register_properties()
     register_logging_handlers()
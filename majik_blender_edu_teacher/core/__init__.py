@@ -1,10 +1,13 @@
 from .crypto import (
     fernet_key_from_string,
+    clear_derived_key_cache,
+    get_derived_key_cache_stats,
     encrypt_metadata,
     decrypt_metadata,
 )
 
 from .hash import (
+    OBJECT_HASH_VERSION,
     compute_object_hash,
     timestamp_to_readable,
 )
@@ -16,11 +19,15 @@ from .constants import (
     SCENE_SIGNATURE_VERSION,
     SCENE_STUDENT_ID_HASH,
     SCENE_ACTIVE_TIMER,
+    SCENE_LOG_WRAPPED_KEY,
+    SCENE_LOG_FORMAT_VERSION,
+    SCENE_PROJECT_ID,
 )
 
 from .properties import register_properties, unregister_properties
 
 from .handlers import on_file_load
+from .log_writer import get_log_save_stats
 
 from .timer import (
     get_total_time,
@@ -60,8 +67,11 @@ from .logging import (
 
 __all__ = [
     "fernet_key_from_string",
+    "clear_derived_key_cache",
+    "get_derived_key_cache_stats",
     "decrypt_metadata",
     "encrypt_metadata",
+    "OBJECT_HASH_VERSION",
     "compute_object_hash",
     "timestamp_to_readable",
     "SCENE_ENCRYPTED_KEY",
@@ -70,9 +80,13 @@ __all__ = [
     "SCENE_SIGNATURE_VERSION",
     "SCENE_STUDENT_ID_HASH",
     "SCENE_ACTIVE_TIMER",
+    "SCENE_LOG_WRAPPED_KEY",
+    "SCENE_LOG_FORMAT_VERSION",
+    "SCENE_PROJECT_ID",
     "register_properties",
     "unregister_properties",
     "on_file_load",
+    "get_log_save_stats",
     "_runtime_metadata",
     "_runtime_logs",
     "_runtime_logs_raw",
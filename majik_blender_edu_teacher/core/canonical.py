@@ -0,0 +1,76 @@
+"""
+Canonical serialization of log entries.
+
+The canonical form is what the entry hash is computed over, here and in the
+analyzer's computeEntryHash:
+
+    json.dumps(entry without "ph", sort_keys=True, separators=(",", ":"))
+
+encoded as UTF-8 (ensure_ascii is on, so the result is pure ASCII). The
+output must stay byte-identical to that expression; canonical_entry_bytes
+builds it directly for the fixed ActionLogEntry key set and falls back to
+json.dumps for anything else. benchmarks/bench_canonical_entry.py checks
+the two against each other.
+"""
+
+import json
+import math
+from json.encoder import encode_basestring_ascii
+from typing import Any, Dict
+
+ENTRY_KEY_SET = frozenset(("t", "a", "o", "ot", "d", "dt", "s", "ph"))
+STATS_KEY_SET = frozenset(("v", "f", "o"))
+
+
+def canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+
+def reference_entry_bytes(entry: Dict[str, Any]) -> bytes:
+    """The canonical form, the slow way. Kept as the definition."""
+    entry_copy = entry.copy()
+    entry_copy.pop("ph", None)
+    return canonical_json(entry_copy).encode("utf-8")
+
+
+def _is_number(value: Any) -> bool:
+    # bool is an int subclass but serializes as true/false
+    kind = type(value)
+    return kind is int or (kind is float and math.isfinite(value))
+
+
+def canonical_entry_bytes(entry: Dict[str, Any]) -> bytes:
+    """
+    Canonical bytes of a log entry, excluding its own "ph".
+    """
+    if entry.keys() != ENTRY_KEY_SET:
+        return reference_entry_bytes(entry)
+
+    t, dt, stats, details = entry["t"], entry["dt"], entry["s"], entry["d"]
+    a, o, ot = entry["a"], entry["o"], entry["ot"]
+    if not (
+        _is_number(t)
+        and _is_number(dt)
+        and type(a) is str
+        and type(o) is str
+        and type(ot) is str
+        and type(details) is dict
+        and type(stats) is dict
+        and stats.keys() == STATS_KEY_SET
+    ):
+        return reference_entry_bytes(entry)
+
+    v, f, so = stats["v"], stats["f"], stats["o"]
+    if not (type(v) is int and type(f) is int and type(so) is int):
+        return reference_entry_bytes(entry)
+
+    # Keys in sorted order: a, d, dt, o, ot, s (f, o, v), t
+    return (
+        f'{{"a":{encode_basestring_ascii(a)},'
+        f'"d":{canonical_json(details) if details else "{}"},'
+        f'"dt":{dt!r},'
+        f'"o":{encode_basestring_ascii(o)},'
+        f'"ot":{encode_basestring_ascii(ot)},'
+        f'"s":{{"f":{f!r},"o":{so!r},"v":{v!r}}},'
+        f'"t":{t!r}}}'
+    ).encode("ascii")
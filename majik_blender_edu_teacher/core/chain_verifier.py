@@ -0,0 +1,73 @@
+"""
+Deep verification of the action-log hash chain.
+
+Every entry is re-hashed and checked against its cached digest and against
+the "ph" link of the entry after it. Nothing in this module touches bpy.
+
+The check is a single serial pass. Hashing small canonical payloads holds
+the GIL, so a thread pool measured no faster than this loop, and worker
+processes cannot import the package (its __init__ imports bpy).
+
+The log is verified through a snapshot, read in chunks, so the main thread
+may keep appending and spilled entries are only materialized a chunk at a
+time.
+"""
+
+from typing import Optional, TypedDict
+
+from .log_store import LogSnapshot, entry_digest
+
+
+DEFAULT_CHUNK_SIZE = 2048
+
+
+class ChainVerifyResult(TypedDict):
+    valid: bool
+    first_broken: Optional[int]  # index of the first bad entry, None if valid
+    reason: str  # "genesis", "link", "modified" or "" when valid
+    checked: int  # number of entries checked
+
+
+def _broken(index: int, reason: str, checked: int) -> ChainVerifyResult:
+    return {"valid": False, "first_broken": index, "reason": reason, "checked": checked}
+
+
+def verify_chain(
+    logs: LogSnapshot,
+    genesis: str,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ChainVerifyResult:
+    """
+    Re-hash every entry and check the chain in one pass.
+
+    An entry is reported as "modified" when its fresh digest differs from
+    the digest cached when it was logged, and as "link" when its "ph" is not
+    the fresh digest of the entry before it. The lowest bad index wins.
+
+    :param logs: The log (or a snapshot of it) to verify
+    :param genesis: Expected "ph" of the first entry
+    :param chunk_size: Entries read from the snapshot at a time
+    """
+    logs = logs.snapshot()
+    count = len(logs)
+    if not count:
+        return {"valid": True, "first_broken": None, "reason": "", "checked": 0}
+
+    if logs.prev_hash(0) != genesis:
+        return _broken(0, "genesis", 1)
+
+    previous: Optional[bytes] = None
+    for start in range(0, count, chunk_size):
+        end = min(start + chunk_size, count)
+        cached = logs.digests(start, end)
+        for offset, entry in enumerate(logs[start:end]):
+            i = start + offset
+            digest = entry_digest(entry)
+            if previous is not None and entry.get("ph") != previous.hex():
+                return _broken(i, "link", i + 1)
+            if digest != cached[offset]:
+                return _broken(i, "modified", i + 1)
+            previous = digest
+
+    return {"valid": True, "first_broken": None, "reason": "", "checked": count}
@@ -9,3 +9,6 @@ SCENE_TEACHER_DOUBLE_HASH = "_tdhash"
 SCENE_STUDENT_ID_HASH = "_student_id_hash"
 SCENE_SIGNATURE_MODE = "_signature_mode"
 SCENE_ACTIVE_TIMER = "_student_timer"
+SCENE_LOG_WRAPPED_KEY = "_log_wrapped_key"
+SCENE_LOG_FORMAT_VERSION = "_log_format_v"
+SCENE_PROJECT_ID = "_majik_project_id"
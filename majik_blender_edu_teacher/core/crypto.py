@@ -2,6 +2,7 @@
 import hashlib
 import base64
 import json
+from typing import Dict, Tuple
 
 
 # --------------------------------------------------
@@ -9,19 +10,50 @@ import json
 # --------------------------------------------------
 
 
-def fernet_key_from_string(password: str, salt: bytes) -> bytes:
+PBKDF2_ITERATIONS = 390000  # OWASP-recommended range
+
+
+# --------------------------------------------------
+# RUNTIME CACHE (NOT SAVED)
+# --------------------------------------------------
+
+_derived_key_cache: Dict[Tuple[str, bytes, int], bytes] = {}
+"""Derived Fernet keys keyed by (sha256(password), salt, iterations)."""
+
+_derived_key_hits: int = 0
+_derived_key_misses: int = 0
+
+
+def fernet_key_from_string(
+    password: str, salt: bytes, iterations: int = PBKDF2_ITERATIONS
+) -> bytes:
     """
     Generates a Fernet-compatible key from a password string using PBKDF2HMAC.
+    Derived keys are cached for the runtime; see clear_derived_key_cache().
 
     :param password: The password string
     :type password: str
     :param salt: The salt bytes
     :type salt: bytes
+    :param iterations: The PBKDF2 iteration count
+    :type iterations: int
     :return: The Fernet-compatible key
     :rtype: bytes
     """
+    global _derived_key_hits, _derived_key_misses
+
+    # Never keep the password itself around as a dict key
+    cache_key = (
+        hashlib.sha256(password.encode()).hexdigest(),
+        bytes(salt),
+        iterations,
+    )
+
+    cached = _derived_key_cache.get(cache_key)
+    if cached is not None:
+        _derived_key_hits += 1
+        return cached
 
-    import base64
     from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
     from cryptography.hazmat.primitives import hashes
 
@@ -29,18 +61,35 @@ def fernet_key_from_string(password: str, salt: bytes) -> bytes:
         algorithm=hashes.SHA256(),
         length=32,  # 32 bytes = 256 bits
         salt=salt,
-        iterations=390000,  # OWASP-recommended range
+        iterations=iterations,
     )
-    return base64.urlsafe_b64encode(kdf.derive(password.encode()))
+    key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
 
+    _derived_key_misses += 1
+    _derived_key_cache[cache_key] = key
+    print(
+        f"[Crypto] Derived key cache miss ({_derived_key_misses} misses, {_derived_key_hits} hits)"
+    )
+    return key
 
 
-# --------------------------------------------------
-# RUNTIME CACHE (NOT SAVED)
-# --------------------------------------------------
+def clear_derived_key_cache() -> None:
+    """Drop every cached derived key and reset the hit/miss counters."""
+    global _derived_key_hits, _derived_key_misses
 
+    _derived_key_cache.clear()
+    _derived_key_hits = 0
+    _derived_key_misses = 0
 
 
+def get_derived_key_cache_stats() -> Dict[str, int]:
+    """Return the derived key cache size and hit/miss counters."""
+    return {
+        "size": len(_derived_key_cache),
+        "hits": _derived_key_hits,
+        "misses": _derived_key_misses,
+    }
+
 
 def xor_obfuscate(data: str, key: str) -> str:
     """
@@ -110,6 +159,94 @@ def aes_decrypt(encrypted_metadata: str, key: str, salt_bytes: bytes) -> str:
     return decrypted
 
 
+# ---------------------------
+# Envelope (data key) functions
+# ---------------------------
+
+
+def generate_data_key() -> bytes:
+    """
+    Generate a random Fernet data key used to encrypt session logs.
+    """
+    from cryptography.fernet import Fernet
+
+    return Fernet.generate_key()
+
+
+def wrap_data_key(data_key: bytes, key: str, salt_bytes: bytes) -> str:
+    """
+    Wrap (encrypt) a data key under the PBKDF2-derived key.
+
+    :param data_key: The Fernet data key to wrap
+    :type data_key: bytes
+    :param key: The key used for derivation
+    :type key: str
+    :param salt_bytes: The salt bytes used for key derivation
+    :type salt_bytes: bytes
+    :return: The wrapped data key as a Fernet token string
+    :rtype: str
+    """
+    from cryptography.fernet import Fernet
+
+    cipher = Fernet(fernet_key_from_string(key, salt_bytes))
+    return cipher.encrypt(data_key).decode()
+
+
+def unwrap_data_key(wrapped_key: str, key: str, salt_bytes: bytes) -> bytes:
+    """
+    Unwrap a data key previously wrapped with wrap_data_key.
+    Raises cryptography.fernet.InvalidToken if the key or salt is wrong.
+
+    :param wrapped_key: The wrapped data key
+    :type wrapped_key: str
+    :param key: The key used for derivation
+    :type key: str
+    :param salt_bytes: The salt bytes used for key derivation
+    :type salt_bytes: bytes
+    :return: The Fernet data key
+    :rtype: bytes
+    """
+    from cryptography.fernet import Fernet
+
+    cipher = Fernet(fernet_key_from_string(key, salt_bytes))
+    return cipher.decrypt(wrapped_key.encode())
+
+
+def derive_subkey(data_key: bytes, info: bytes, length: int = 32) -> bytes:
+    """
+    Derive an independent subkey from a data key using HKDF-SHA256.
+
+    :param data_key: The data key
+    :type data_key: bytes
+    :param info: Context label separating subkeys derived from the same data key
+    :type info: bytes
+    :param length: The subkey length in bytes
+    :type length: int
+    :return: The subkey
+    :rtype: bytes
+    """
+    from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+    from cryptography.hazmat.primitives import hashes
+
+    return HKDF(
+        algorithm=hashes.SHA256(), length=length, salt=None, info=info
+    ).derive(data_key)
+
+
+def rewrap_data_key(
+    wrapped_key: str,
+    old_key: str,
+    old_salt_bytes: bytes,
+    new_key: str,
+    new_salt_bytes: bytes,
+) -> str:
+    """
+    Re-wrap a data key under a new key without touching the data it protects.
+    """
+    data_key = unwrap_data_key(wrapped_key, old_key, old_salt_bytes)
+    return wrap_data_key(data_key, new_key, new_salt_bytes)
+
+
 # ---------------------------
 # High-level wrapper functions
 # ---------------------------
@@ -2,9 +2,17 @@
 from .runtime import clear_runtime
 from .logging import load_logs_from_scene
 from .timer import load_timer_from_scene
+from .recovery import close_recovery
+from .log_writer import cancel_log_writes
+from .scene_stats import reset_scene_stats
 
 def on_file_load(scene):
     scene.teacher_key = ""
+    # A write planned for the previous file must not land in this one
+    cancel_log_writes()
+    # The next journal write opens the loaded project's journal
+    close_recovery()
     clear_runtime()
+    reset_scene_stats()
     load_logs_from_scene(scene)
     load_timer_from_scene(scene)
@@ -1,19 +1,40 @@
-
 import bpy  # type: ignore
 from datetime import datetime
+import sys
 import json
+import struct
 import hashlib
+from array import array
+
+
+# Geometry hash versions, recorded as "hash_version" in the encrypted
+# metadata (missing = v1)
+OBJECT_HASH_V1 = 1  # sha256 of sorted-key JSON of vertex/edge/polygon tuples
+OBJECT_HASH_V2 = 2  # sha256 of a versioned header + little-endian foreach_get buffers
+OBJECT_HASH_VERSION = OBJECT_HASH_V2  # used for new signatures
+
+_HASH_V2_MAGIC = b"MJKH"
+_HASH_V2_HEADER = struct.Struct("<4sBIIII")  # magic, version, verts, edges, polygons, loops
 
 
 def timestamp_to_readable(ts: int) -> str:
     return datetime.fromtimestamp(ts).strftime("%B %d, %Y | %I:%M %p")
 
 
-def compute_object_hash(obj: bpy.types.Object) -> str | None:
+def compute_object_hash(
+    obj: bpy.types.Object, version: int = OBJECT_HASH_VERSION
+) -> str | None:
     if obj.type != "MESH":
         return None
 
-    mesh = obj.data
+    if version == OBJECT_HASH_V1:
+        return _object_hash_v1(obj.data)
+    if version == OBJECT_HASH_V2:
+        return _object_hash_v2(obj.data)
+    raise ValueError(f"Unsupported object hash version {version}")
+
+
+def _object_hash_v1(mesh) -> str:
     payload = json.dumps(
         {
             "vertices": [tuple(v.co) for v in mesh.vertices],
@@ -25,3 +46,35 @@ def compute_object_hash(obj: bpy.types.Object) -> str | None:
     return hashlib.sha256(payload.encode()).hexdigest()
 
 
+def _read_buffer(collection, attr: str, typecode: str, count: int) -> array:
+    buf = array(typecode, bytes(count * array(typecode).itemsize))
+    if count:
+        collection.foreach_get(attr, buf)
+    if sys.byteorder != "little":
+        buf.byteswap()
+    return buf
+
+
+def _object_hash_v2(mesh) -> str:
+    """
+    Hashes the mesh as raw buffers instead of per-element Python tuples:
+    vertex co (float32 x3), edge vertices (int32 x2), polygon loop_start
+    and loop_total (int32) and loop vertex_index (int32), in that order,
+    after a header holding the version and the element counts.
+    """
+    n_verts = len(mesh.vertices)
+    n_edges = len(mesh.edges)
+    n_polys = len(mesh.polygons)
+    n_loops = len(mesh.loops)
+
+    h = hashlib.sha256(
+        _HASH_V2_HEADER.pack(
+            _HASH_V2_MAGIC, OBJECT_HASH_V2, n_verts, n_edges, n_polys, n_loops
+        )
+    )
+    h.update(_read_buffer(mesh.vertices, "co", "f", n_verts * 3))
+    h.update(_read_buffer(mesh.edges, "vertices", "i", n_edges * 2))
+    h.update(_read_buffer(mesh.polygons, "loop_start", "i", n_polys))
+    h.update(_read_buffer(mesh.polygons, "loop_total", "i", n_polys))
+    h.update(_read_buffer(mesh.loops, "vertex_index", "i", n_loops))
+    return h.hexdigest()
@@ -0,0 +1,560 @@
+"""
+Columnar in-memory store for the runtime action log.
+
+Entries are kept as typed columns instead of one dict per entry:
+
+    t, dt      array("d")
+    v, f, so   array("q")     scene stats
+    a, o, ot   array("L")     indexes into an interned string table
+    ph         bytearray      32 raw bytes per entry
+    digest     bytearray      32 raw bytes per entry, the entry's own hash
+    d          list           action details (None when empty)
+
+LogStore behaves like the List[ActionLogEntry] it replaces: len(), indexing
+(including [-1] and slices), iteration and copy() return plain dicts. They
+are new dicts on every read, and appended entries are copied in, so
+mutating an entry (or its "d") never reaches a frozen chunk or its cached
+digest.
+Entries without the exact ActionLogEntry shape are kept verbatim alongside
+the columns, so every entry reads back exactly as it was appended.
+
+The digest column caches compute_entry_hash of every entry as it is
+appended, so the hash chain can be extended and checked without
+re-serializing entries.
+
+The columns are split into chunks of CHUNK_SIZE entries. A full chunk is
+frozen and never changed again; only the tail chunk is appended to, and
+clear(), replace() and spill() swap in new containers instead of mutating
+shared ones. snapshot() is therefore O(1): a LogSnapshot shares the chunks
+and keeps seeing the log as it was, even while the main thread appends,
+and can be read from worker threads.
+
+Long logs can be bounded in memory with spill(): the oldest frozen chunks
+are dropped once they are persisted elsewhere, keeping only the digest of
+the last spilled entry for chaining (and the first two entries, which the
+working-time queries read). Indexes stay the same; reading a spilled entry
+goes through the spill loader, which returns the persisted block containing
+it (one log segment). The loader may need bpy, so spilled entries should
+only be read on the main thread.
+"""
+
+import hashlib
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .canonical import canonical_entry_bytes
+from .log_types import ActionLogEntry
+from .text.log_binary import is_compact_entry
+
+
+DIGEST_SIZE = 32
+CHUNK_SIZE = 4096
+
+# index -> (index of the first entry in the block, entries of the block)
+SpillLoader = Callable[[int], Tuple[int, List[ActionLogEntry]]]
+
+
+def entry_digest(entry: Dict[str, Any]) -> bytes:
+    """
+    SHA-256 of an entry's canonical JSON, excluding its own "ph" field.
+    """
+    return hashlib.sha256(canonical_entry_bytes(entry)).digest()
+
+
+class _Chunk:
+    """Columns of up to CHUNK_SIZE consecutive entries."""
+
+    __slots__ = ("t", "dt", "v", "f", "so", "a", "o", "ot", "ph", "digest", "d", "raw")
+
+    def __init__(self):
+        self.t = array("d")
+        self.dt = array("d")
+        self.v = array("q")
+        self.f = array("q")
+        self.so = array("q")
+        self.a = array("L")
+        self.o = array("L")
+        self.ot = array("L")
+        self.ph = bytearray()
+        self.digest = bytearray()
+        self.d: List[Optional[Dict[str, Any]]] = []
+        # Entries kept verbatim, by row
+        self.raw: Dict[int, ActionLogEntry] = {}
+
+
+class LogSnapshot:
+    """
+    Read-only view of a LogStore as it was when snapshot() was called.
+    """
+
+    _chunks: List[_Chunk]  # frozen chunks; only ever appended to
+    _frozen: int  # number of frozen chunks in this view
+    _tail: _Chunk
+    _tail_len: int  # rows of the tail chunk in this view
+    _base: int  # number of spilled entries
+    _base_digest: bytes
+    _pinned: Dict[int, ActionLogEntry]
+    _strings: List[str]
+    _spill_loader: Optional[SpillLoader]
+    _spill_cache: Tuple[int, List[ActionLogEntry]]
+
+    def _share(self, other: "LogSnapshot") -> None:
+        self._chunks = other._chunks
+        self._frozen = other._frozen
+        self._tail = other._tail
+        self._tail_len = other._tail_len
+        self._base = other._base
+        self._base_digest = other._base_digest
+        self._pinned = other._pinned
+        self._strings = other._strings
+        self._spill_loader = other._spill_loader
+        self._spill_cache = other._spill_cache
+
+    def snapshot(self) -> "LogSnapshot":
+        return self
+
+    # --------------------------------------------------
+    # LIST-LIKE ACCESS
+    # --------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._base + self._frozen * CHUNK_SIZE + self._tail_len
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def _index(self, index: int) -> int:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("log index out of range")
+        return index
+
+    def _locate(self, index: int) -> Tuple[_Chunk, int]:
+        """Chunk and row of an in-memory entry."""
+        chunk, row = divmod(index - self._base, CHUNK_SIZE)
+        if chunk < self._frozen:
+            return self._chunks[chunk], row
+        return self._tail, row
+
+    def _parts(self, start: int, end: int) -> Iterator[Tuple[int, _Chunk, int, int]]:
+        """
+        (index of row 0, chunk, first row, end row) for each chunk holding
+        in-memory entries of [start, end).
+        """
+        start = max(start, self._base)
+        while start < end:
+            chunk, row = self._locate(start)
+            offset = start - row
+            stop = min(end, offset + CHUNK_SIZE)
+            yield offset, chunk, row, stop - offset
+            start = stop
+
+    def _buffer(self, chunk: _Chunk, name: str):
+        # The tail is still appended to, and a bytearray exporting a
+        # memoryview cannot be resized, so only frozen chunks are viewed
+        data = getattr(chunk, name)
+        return data if chunk is self._tail else memoryview(data)
+
+    def _entry(self, index: int) -> ActionLogEntry:
+        if index < self._base:
+            return self._spilled_entry(index)
+        chunk, i = self._locate(index)
+        raw = chunk.raw.get(i)
+        if raw is not None:
+            return _copy_entry(raw)
+        strings = self._strings
+        return {
+            "t": chunk.t[i],
+            "a": strings[chunk.a[i]],
+            "o": strings[chunk.o[i]],
+            "ot": strings[chunk.ot[i]],
+            "d": dict(chunk.d[i]) if chunk.d[i] else {},
+            "dt": chunk.dt[i],
+            "s": {"v": chunk.v[i], "f": chunk.f[i], "o": chunk.so[i]},
+            "ph": chunk.ph[DIGEST_SIZE * i : DIGEST_SIZE * (i + 1)].hex(),
+        }
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return list(self._iter_range(start, stop))
+            return [self._entry(i) for i in range(start, stop, step)]
+        return self._entry(self._index(index))
+
+    def _iter_range(self, start: int, stop: int) -> Iterator[ActionLogEntry]:
+        if start < self._base:
+            yield from self._iter_spilled(start, min(stop, self._base))
+        for i in range(max(start, self._base), stop):
+            yield self._entry(i)
+
+    def __iter__(self) -> Iterator[ActionLogEntry]:
+        return self._iter_range(0, len(self))
+
+    def copy(self) -> List[ActionLogEntry]:
+        """Return the log as a plain list of entry dicts (re-reads spilled entries)."""
+        return list(self._iter_range(0, len(self)))
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__} {len(self)} entries ({self._base} spilled), "
+            f"{len(self._strings)} strings>"
+        )
+
+    # --------------------------------------------------
+    # COLUMN QUERIES
+    # --------------------------------------------------
+
+    def timestamp(self, index: int) -> float:
+        i = self._index(index)
+        if i < self._base:
+            return _as_float(self._entry(i).get("t"))
+        chunk, row = self._locate(i)
+        return chunk.t[row]
+
+    def action(self, index: int) -> str:
+        i = self._index(index)
+        if i < self._base:
+            return self._entry(i).get("a", "")
+        chunk, row = self._locate(i)
+        raw = chunk.raw.get(row)
+        if raw is not None:
+            return raw.get("a", "")
+        return self._strings[chunk.a[row]]
+
+    def _time_index(self, value: float, right: bool) -> int:
+        """First index with t > value (right) or t >= value (left)."""
+        find = bisect_right if right else bisect_left
+        if self._base:
+            first = self.timestamp(self._base) if len(self) > self._base else None
+            if first is None or (value < first if right else value <= first):
+                return find(self._column("t", 0, self._base), value)
+
+        for offset, chunk, lo, hi in self._parts(self._base, len(self)):
+            row = find(chunk.t, value, lo, hi)
+            if row < hi:
+                return offset + row
+        return len(self)
+
+    def index_range_for_time(
+        self, start_time: Optional[float] = None, end_time: Optional[float] = None
+    ) -> Tuple[int, int]:
+        """
+        Half-open index range of the entries with start_time <= t <= end_time.
+        Relies on entries being appended in time order. Spilled entries are
+        only re-read when the range reaches before the in-memory entries.
+        """
+        lo = 0 if start_time is None else self._time_index(start_time, False)
+        hi = len(self) if end_time is None else self._time_index(end_time, True)
+        return lo, max(lo, hi)
+
+    def total_duration(self, start: int = 0, end: Optional[int] = None) -> float:
+        """Sum of the recorded action durations (dt) over an index range."""
+        return sum(self._column("dt", start, end))
+
+    def stats_series(
+        self, start: int = 0, end: Optional[int] = None
+    ) -> Dict[str, array]:
+        """Timestamps and scene stats over an index range, as typed columns."""
+        return {
+            "t": self._column("t", start, end),
+            "v": self._column("v", start, end),
+            "f": self._column("f", start, end),
+            "o": self._column("so", start, end),
+        }
+
+    def _column(self, name: str, start: int, end: Optional[int]) -> array:
+        """One column over an index range, including re-read spilled entries."""
+        start, end, _ = slice(start, end).indices(len(self))
+        result = array("d" if name in ("t", "dt") else "q")
+
+        if start < self._base:
+            convert = _as_float if result.typecode == "d" else _as_int
+            key = "o" if name == "so" else name
+            for entry in self._iter_spilled(start, min(end, self._base)):
+                source = entry.get("s") if name in ("v", "f", "so") else entry
+                result.append(convert(source.get(key) if isinstance(source, dict) else None))
+
+        for _, chunk, lo, hi in self._parts(start, end):
+            result.extend(getattr(chunk, name)[lo:hi])
+        return result
+
+    # --------------------------------------------------
+    # HASH CHAIN
+    # --------------------------------------------------
+
+    def digest(self, index: int) -> bytes:
+        """
+        The cached compute_entry_hash of an entry, as raw bytes. Spilled
+        entries (other than the last) are re-read and hashed.
+        """
+        i = self._index(index)
+        if i < self._base:
+            if i == self._base - 1:
+                return self._base_digest
+            return entry_digest(self._entry(i))
+        chunk, row = self._locate(i)
+        return bytes(chunk.digest[DIGEST_SIZE * row : DIGEST_SIZE * (row + 1)])
+
+    def digests(self, start: int = 0, end: Optional[int] = None) -> List[bytes]:
+        """The cached digests of the entries [start, end)."""
+        start, end, _ = slice(start, end).indices(len(self))
+        result: List[bytes] = []
+        if start < self._base:
+            result.extend(
+                entry_digest(entry)
+                for entry in self._iter_spilled(start, min(end, self._base))
+            )
+
+        for _, chunk, lo, hi in self._parts(start, end):
+            view = self._buffer(chunk, "digest")
+            result.extend(
+                bytes(view[DIGEST_SIZE * i : DIGEST_SIZE * (i + 1)]) for i in range(lo, hi)
+            )
+        return result
+
+    def entry_hash(self, index: int) -> str:
+        """The cached compute_entry_hash of an entry, as hex."""
+        return self.digest(index).hex()
+
+    def prev_hash(self, index: int) -> Any:
+        """The "ph" field of an entry, without rebuilding the entry."""
+        i = self._index(index)
+        if i < self._base:
+            return self._entry(i).get("ph")
+        chunk, row = self._locate(i)
+        raw = chunk.raw.get(row)
+        if raw is not None:
+            return raw.get("ph")
+        return chunk.ph[DIGEST_SIZE * row : DIGEST_SIZE * (row + 1)].hex()
+
+    def find_chain_break(self, start: int = 1) -> Optional[int]:
+        """
+        Index of the first entry at or after start whose "ph" is not the
+        cached digest of the entry before it, or None if the chain holds.
+        Spilled entries in the range are re-read and hashed.
+        """
+        start = max(start, 1)
+        base = self._base
+        if start >= len(self):
+            return None
+
+        previous = self.digest(start - 1)
+        if start < base:
+            for i, entry in enumerate(self._iter_spilled(start, base), start):
+                if entry.get("ph") != previous.hex():
+                    return i
+                previous = entry_digest(entry)
+            if previous != self._base_digest:
+                # The re-read entries are not the ones that were spilled
+                return base - 1
+
+        for offset, chunk, lo, hi in self._parts(start, len(self)):
+            ph = self._buffer(chunk, "ph")
+            digest = self._buffer(chunk, "digest")
+            raw = chunk.raw
+            for i in range(lo, hi):
+                if i in raw:
+                    if raw[i].get("ph") != bytes(previous).hex():
+                        return offset + i
+                elif ph[DIGEST_SIZE * i : DIGEST_SIZE * (i + 1)] != previous:
+                    return offset + i
+                previous = digest[DIGEST_SIZE * i : DIGEST_SIZE * (i + 1)]
+        return None
+
+    # --------------------------------------------------
+    # SPILLED ENTRIES
+    # --------------------------------------------------
+
+    @property
+    def spilled(self) -> int:
+        """Number of leading entries that are not held in memory."""
+        return self._base
+
+    def _spilled_block(self, index: int) -> Tuple[int, List[ActionLogEntry]]:
+        start, block = self._spill_cache
+        if start <= index < start + len(block):
+            return start, block
+        if self._spill_loader is None:
+            raise RuntimeError("Spilled log entries cannot be read back")
+
+        start, block = self._spill_loader(index)
+        if not start <= index < start + len(block):
+            raise IndexError(f"Spilled log entry {index} is missing from the persisted log")
+        self._spill_cache = (start, block)
+        return start, block
+
+    def _spilled_entry(self, index: int) -> ActionLogEntry:
+        pinned = self._pinned.get(index)
+        if pinned is not None:
+            return _copy_entry(pinned)
+        start, block = self._spilled_block(index)
+        return _copy_entry(block[index - start])
+
+    def _iter_spilled(self, start: int, end: int) -> Iterator[ActionLogEntry]:
+        """Spilled entries [start, end), read back one block at a time."""
+        i = start
+        while i < end:
+            pinned = self._pinned.get(i)
+            if pinned is not None:
+                yield _copy_entry(pinned)
+                i += 1
+                continue
+            block_start, block = self._spilled_block(i)
+            stop = min(end, block_start + len(block))
+            for entry in block[i - block_start : stop - block_start]:
+                yield _copy_entry(entry)
+            i = stop
+
+
+class LogStore(LogSnapshot):
+    """
+    List-like columnar store for ActionLogEntry.
+    """
+
+    def __init__(self, entries: Optional[Iterable[ActionLogEntry]] = None):
+        self._spill_loader = None
+        self.clear()
+        if entries:
+            self.extend(entries)
+
+    def snapshot(self) -> LogSnapshot:
+        """
+        O(1) immutable view of the log as it is now. Appends, spills and
+        clears made afterwards do not show in it.
+        """
+        view = LogSnapshot()
+        view._share(self)
+        return view
+
+    # --------------------------------------------------
+    # MUTATION
+    # --------------------------------------------------
+
+    def clear(self) -> None:
+        self._chunks = []
+        self._frozen = 0
+        self._tail = _Chunk()
+        self._tail_len = 0
+        self._strings = []
+        self._string_ids: Dict[str, int] = {}
+        # Spilled entries: [0, _base) are not in the chunks
+        self._base = 0
+        self._base_digest = b""
+        self._pinned = {}
+        self._spill_cache = (0, [])
+
+    def _intern(self, value: str) -> int:
+        index = self._string_ids.get(value)
+        if index is None:
+            index = self._string_ids[value] = len(self._strings)
+            self._strings.append(value)
+        return index
+
+    def append(self, entry: ActionLogEntry) -> None:
+        tail = self._tail
+        tail.digest += entry_digest(entry)
+
+        if is_compact_entry(entry):
+            stats = entry["s"]
+            tail.t.append(entry["t"])
+            tail.dt.append(entry["dt"])
+            tail.v.append(stats["v"])
+            tail.f.append(stats["f"])
+            tail.so.append(stats["o"])
+            tail.a.append(self._intern(entry["a"]))
+            tail.o.append(self._intern(entry["o"]))
+            tail.ot.append(self._intern(entry["ot"]))
+            tail.ph += bytes.fromhex(entry["ph"])
+            tail.d.append(dict(entry["d"]) if entry["d"] else None)
+        else:
+            # Keep the entry verbatim; the columns get best-effort values so
+            # time and stats queries still cover it.
+            tail.raw[len(tail.t)] = _copy_entry(entry)
+            stats = entry.get("s") if isinstance(entry.get("s"), dict) else {}
+            tail.t.append(_as_float(entry.get("t")))
+            tail.dt.append(_as_float(entry.get("dt")))
+            tail.v.append(_as_int(stats.get("v")))
+            tail.f.append(_as_int(stats.get("f")))
+            tail.so.append(_as_int(stats.get("o")))
+            tail.a.append(self._intern(str(entry.get("a", ""))))
+            tail.o.append(self._intern(str(entry.get("o", ""))))
+            tail.ot.append(self._intern(str(entry.get("ot", ""))))
+            tail.ph += bytes(DIGEST_SIZE)
+            tail.d.append(None)
+
+        self._tail_len += 1
+        if self._tail_len == CHUNK_SIZE:
+            # Freeze the tail; snapshots keep reading it unchanged
+            self._chunks.append(tail)
+            self._frozen += 1
+            self._tail = _Chunk()
+            self._tail_len = 0
+
+    def extend(self, entries: Iterable[ActionLogEntry]) -> None:
+        for entry in entries:
+            self.append(entry)
+
+    def replace(self, entries: Iterable[ActionLogEntry]) -> None:
+        """Replace the whole log, keeping this store object."""
+        self.clear()
+        self.extend(entries)
+
+    # --------------------------------------------------
+    # SPILLING
+    # --------------------------------------------------
+
+    def set_spill_loader(self, loader: Optional[SpillLoader]) -> None:
+        """Set how spilled entries are read back (see SpillLoader)."""
+        self._spill_loader = loader
+        self._spill_cache = (0, [])
+
+    def spill(self, count: int) -> int:
+        """
+        Drop up to count of the oldest in-memory entries, in whole frozen
+        chunks. They must be persisted where the spill loader can read them
+        back.
+
+        :return: Number of entries dropped
+        """
+        chunks = min(max(count, 0) // CHUNK_SIZE, self._frozen)
+        if not chunks:
+            return 0
+        if self._spill_loader is None:
+            raise RuntimeError("LogStore has no spill loader")
+
+        count = chunks * CHUNK_SIZE
+        base = self._base
+        end = base + count
+        pinned = {i: entry for i, entry in self._pinned.items() if i < 2}
+        for i in range(base, min(end, 2)):
+            pinned[i] = self._entry(i)
+        pinned[end - 1] = self._entry(end - 1)
+        self._base_digest = self.digest(end - 1)
+
+        self._chunks = self._chunks[chunks:]
+        self._frozen -= chunks
+        self._pinned = pinned
+        self._base = end
+        self._spill_cache = (0, [])
+        return count
+
+
+def _copy_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy an entry and its "d" and "s" dicts."""
+    copied = dict(entry)
+    for key in ("d", "s"):
+        if isinstance(copied.get(key), dict):
+            copied[key] = dict(copied[key])
+    return copied
+
+
+def _as_float(value: Any) -> float:
+    return float(value) if isinstance(value, (int, float)) else 0.0
+
+
+def _as_int(value: Any) -> int:
+    return int(value) if isinstance(value, (int, float)) else 0
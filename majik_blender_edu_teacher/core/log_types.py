@@ -0,0 +1,26 @@
+"""
+Shared type definitions for the action log.
+
+A leaf module: it imports nothing from the package, so the log codecs and
+stores can use these types without pulling in runtime state.
+"""
+
+from typing import Any, Dict, Optional, TypedDict
+
+
+class SceneStats(TypedDict):
+    v: int  # Vertex Count
+    f: int  # Face Count
+    o: int  # Object Count
+
+
+class ActionLogEntry(TypedDict):
+    t: float  # timestamp
+    lu: Optional[float]
+    a: str  # action_type
+    o: str  # object_name
+    ot: str  # object_type
+    d: Dict[str, Any]  # action_details
+    dt: float  # duration
+    s: SceneStats  # scene_stats
+    ph: str  # previous hash or genesis hash
@@ -0,0 +1,309 @@
+"""
+Background persistence and save scheduling for the session log.
+
+Encoding a segment (binary encode, zlib, AES-GCM, base64) is the expensive
+part of saving the log, so it runs on a single worker thread:
+
+    main thread:  SessionLogController.plan_write    snapshot + cipher
+    worker:       SessionLogController.encode_write  Text lines
+    main thread:  SessionLogController.apply_write   Text write (bpy.app.timers)
+
+Save requests are coalesced: a request waits LOG_SAVE_COALESCE_WINDOW
+seconds for further requests (at most LOG_SAVE_MAX_DELAY in total) and is
+dropped when the log has no unsaved entries. The scheduler owns the dirty
+flag: it marks the log synced once the Text holds every entry.
+
+One write is in flight at a time. flush_log_writes() waits for it and
+writes whatever is left on the spot, so save_pre always stores a current
+log in the .blend. A write that fails to encode is requested again; a
+failed plan or apply is reported and left to the next save request, with
+the log still dirty.
+
+Once written, entries older than the last LOG_MEMORY_TAIL_ENTRIES are
+spilled from the runtime log (see LogStore.spill) and re-read from their
+segments only when something asks for them (export, deep verification).
+"""
+
+import bpy  # type: ignore
+import time
+from functools import partial
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Tuple, TypedDict
+
+from ..core import runtime
+from .text.session_log_controller import LogWrite, SessionLogController
+
+
+class LogSaveStats(TypedDict):
+    requested: int  # save_logs_to_scene calls
+    skipped: int  # requests dropped because nothing changed
+    coalesced: int  # requests folded into an already pending save
+    performed: int  # Text writes (encrypt-and-write cycles)
+    stale: int  # background writes discarded because the Text changed
+    failed: int  # writes that raised while planning, encoding or applying
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_in_flight: Optional[Tuple[LogWrite, Future]] = None
+# Scene of the pending (not yet planned) save, and when it was requested
+_pending_scene: Optional[str] = None
+_first_request: float = 0.0
+_last_request: float = 0.0
+_stats: LogSaveStats = {
+    "requested": 0,
+    "skipped": 0,
+    "coalesced": 0,
+    "performed": 0,
+    "stale": 0,
+    "failed": 0,
+}
+
+
+def needs_log_write() -> bool:
+    """
+    Whether the Text is missing entries of the runtime log. The persisted
+    count also catches entries appended without mark_log_dirty() and a Text
+    that was cleared or must be rewritten (legacy blob).
+    """
+    return runtime.is_log_dirty() or runtime._log_persisted_count != len(
+        runtime._runtime_logs_raw
+    )
+
+
+def _mark_synced_if_complete(scene: bpy.types.Scene) -> None:
+    if runtime._log_persisted_count == len(runtime._runtime_logs_raw):
+        runtime.mark_log_synced()
+    spill_persisted_logs(scene)
+
+
+def _read_spilled(scene_name: str, index: int):
+    # The scene the log was saved from holds the keys for its segments
+    scene = bpy.data.scenes.get(scene_name)
+    if scene is None:
+        raise RuntimeError(f"Scene '{scene_name}' holding the session log is gone")
+    return SessionLogController.read_segment_at(index, scene=scene)
+
+
+def spill_persisted_logs(scene: bpy.types.Scene) -> int:
+    """
+    Drop saved entries beyond the in-memory tail from the runtime log.
+    Only entries stored in the Text and already covered by a checkpoint are
+    spilled, in batches of at least LOG_SPILL_BATCH (rounded down to whole
+    LogStore chunks).
+
+    :return: Number of entries spilled
+    """
+    keep = runtime.LOG_MEMORY_TAIL_ENTRIES
+    logs = runtime._runtime_logs_raw
+    if keep <= 0:
+        return 0
+
+    checkpoints = runtime._log_checkpoints
+    target = min(
+        runtime._log_persisted_count,
+        checkpoints[-1]["end"] if checkpoints else 0,
+        len(logs) - keep,
+    )
+    count = target - logs.spilled
+    if count < runtime.LOG_SPILL_BATCH:
+        return 0
+
+    logs.set_spill_loader(partial(_read_spilled, scene.name))
+    count = logs.spill(count)
+    if count:
+        print(f"[LogWriter] Spilled {count} saved entries ({logs.spilled} not in memory)")
+    return count
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="majik-log-writer")
+    return _executor
+
+
+def _request(scene_name: str) -> None:
+    global _pending_scene, _first_request, _last_request
+
+    now = time.monotonic()
+    if _pending_scene is None:
+        _first_request = now
+    _pending_scene = scene_name
+    _last_request = now
+
+
+def _start_write(scene: bpy.types.Scene) -> bool:
+    """Plan a save and hand its encoding to the worker. False if nothing to write."""
+    global _in_flight
+
+    job = SessionLogController.plan_write(
+        runtime._runtime_logs_raw,
+        scene=scene,
+        checkpoints=runtime._log_checkpoints,
+    )
+    if job is None:
+        _mark_synced_if_complete(scene)
+        return False
+
+    _in_flight = (job, _get_executor().submit(SessionLogController.encode_write, job))
+    return True
+
+
+def _finish_write() -> None:
+    """Wait for the write in flight and apply it to the Text."""
+    global _in_flight
+
+    job, future = _in_flight
+    _in_flight = None
+    try:
+        lines = future.result()
+    except Exception as e:
+        # The log is still dirty; plan the write again after the window
+        _stats["failed"] += 1
+        print(f"[LogWriter][ERROR] Encoding the session log failed, retrying: {e}")
+        _request(job["scene"])
+        return
+
+    try:
+        applied = SessionLogController.apply_write(job, lines)
+    except Exception as e:
+        _stats["failed"] += 1
+        print(f"[LogWriter][ERROR] Writing the session log failed: {e}")
+        return
+
+    if applied:
+        _stats["performed"] += 1
+        scene = bpy.data.scenes.get(job["scene"])
+        if scene is not None:
+            _mark_synced_if_complete(scene)
+    else:
+        # Plan again against the current Text
+        _stats["stale"] += 1
+        _request(job["scene"])
+
+
+def _tick() -> Optional[float]:
+    """
+    Timer callback: apply a finished write, then start the pending save once
+    requests have been quiet for the coalescing window.
+    """
+    global _pending_scene
+
+    if _in_flight is not None:
+        if not _in_flight[1].done():
+            return runtime.LOG_WRITE_POLL_INTERVAL
+        _finish_write()
+
+    if _pending_scene is None:
+        return None
+
+    now = time.monotonic()
+    wait = min(
+        _last_request + runtime.LOG_SAVE_COALESCE_WINDOW,
+        _first_request + runtime.LOG_SAVE_MAX_DELAY,
+    ) - now
+    if wait > 0:
+        return wait
+
+    scene = bpy.data.scenes.get(_pending_scene)
+    _pending_scene = None
+    if scene is None or not needs_log_write():
+        _stats["skipped"] += 1
+        return None
+    try:
+        started = _start_write(scene)
+    except Exception as e:
+        # Raising would silently unregister the timer; the log stays dirty
+        _stats["failed"] += 1
+        print(f"[LogWriter][ERROR] Planning the session log write failed: {e}")
+        return None
+    if started:
+        return runtime.LOG_WRITE_POLL_INTERVAL
+    return None
+
+
+def schedule_log_save(scene: bpy.types.Scene) -> None:
+    """
+    Request a save of the runtime log to the scene's Text. Requests arriving
+    close together are written once, in the background; use
+    flush_log_writes() when the Text must be current now.
+    """
+    _stats["requested"] += 1
+
+    if _pending_scene is not None:
+        _stats["coalesced"] += 1
+    elif not needs_log_write():
+        _stats["skipped"] += 1
+        return
+
+    if not runtime.LOG_BACKGROUND_WRITES:
+        flush_log_writes(scene)
+        return
+
+    _request(scene.name)
+    if not bpy.app.timers.is_registered(_tick):
+        bpy.app.timers.register(_tick, first_interval=runtime.LOG_WRITE_POLL_INTERVAL)
+
+
+def flush_log_writes(scene: bpy.types.Scene) -> None:
+    """
+    Block until the Text holds the whole runtime log: wait for the write in
+    flight, then write the entries logged since it was planned.
+    """
+    global _pending_scene
+
+    if _in_flight is not None:
+        print("[LogWriter] Waiting for the session log write in flight")
+        _finish_write()
+    _pending_scene = None
+
+    if not needs_log_write():
+        print("[LogWriter] Session log already saved")
+        return
+
+    if SessionLogController.save_logs_to_text(
+        runtime._runtime_logs_raw,
+        scene=scene,
+        checkpoints=runtime._log_checkpoints,
+    ):
+        _stats["performed"] += 1
+    _mark_synced_if_complete(scene)
+
+
+def cancel_log_writes() -> None:
+    """
+    Drop the pending save and the write in flight without applying them,
+    e.g. when another file is loaded and the Text they were for is gone.
+    """
+    global _in_flight, _pending_scene
+
+    _in_flight = None
+    _pending_scene = None
+    if bpy.app.timers.is_registered(_tick):
+        bpy.app.timers.unregister(_tick)
+
+
+def shutdown_log_writer() -> None:
+    """Flush the pending save and the write in flight, then stop the worker thread."""
+    global _executor
+
+    if _in_flight is not None or _pending_scene is not None:
+        scene = bpy.data.scenes.get(_pending_scene or _in_flight[0]["scene"])
+        if scene is not None:
+            flush_log_writes(scene)
+    cancel_log_writes()
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+    print(f"[LogWriter] Save stats: {get_log_save_stats()}")
+
+
+def get_log_save_stats() -> LogSaveStats:
+    """Requested versus performed saves since the last reset."""
+    return dict(_stats)
+
+
+def reset_log_save_stats() -> None:
+    for key in _stats:
+        _stats[key] = 0
@@ -1,6 +1,6 @@
 import bpy  # type: ignore
-import time
 import json
+import time
 import base64
 import hashlib
 
@@ -8,16 +8,40 @@ from ..core import runtime
 from ..core.text.session_log_controller import SessionLogController
 from .timer import save_timer_to_scene, load_timer_from_scene
 
-from .scene_stats import SceneStatsManager  # assuming you saved the class here
+from .scene_stats import get_stats_engine, get_stats_manager, reset_stats_engine
 
 
 from .constants import (
     SCENE_SIGNATURE_MODE,
 )
 
-from ..core.recovery import Recovery
+from .log_writer import (
+    schedule_log_save,
+    flush_log_writes,
+    needs_log_write,
+    shutdown_log_writer,
+    spill_persisted_logs,
+)
+from ..core.recovery import (
+    get_recovery,
+    start_project_session,
+    forget_pending_project,
+    close_recovery,
+    register_recovery_timer,
+    unregister_recovery_timer,
+)
+from .log_store import entry_digest
+from .log_types import ActionLogEntry, SceneStats
+from .chain_verifier import ChainVerifyResult, verify_chain
+from .merkle import (
+    make_checkpoint,
+    merkle_proof,
+    verify_inclusion,
+    find_checkpoint,
+    find_checkpoint_chain_break,
+)
 
-from typing import Set, TypedDict, Dict, Any, List, Literal
+from typing import Set, TypedDict, Dict, Any, List, Literal, Optional, Sequence, TextIO
 
 
 # --------------------------------------------------
@@ -25,30 +49,13 @@ from typing import Set, TypedDict, Dict, Any, List, Literal
 # --------------------------------------------------
 
 
-class SceneStats(TypedDict):
-    v: int  # Vertex Count
-    f: int  # Face Count
-    o: int  # Object Count
-
-
-class ActionLogEntry(TypedDict):
-    t: float  # timestamp
-    a: str  # action_type
-    o: str  # object_name
-    ot: str  # object_type
-    d: Dict[str, Any]  # action_details
-    dt: float  # duration
-    s: SceneStats  # scene_stats
-    ph: str  # previous hash or genesis hash
-
-
 class WorkingPeriod(TypedDict):
     start: str
     end: str
 
 
 class ExportLogsResult(TypedDict):
-    data: List[ActionLogEntry]
+    data: Sequence[ActionLogEntry]  # LogSnapshot, not a list (see write_export_json)
     status: Literal["valid", "tampered"]
     total_working_time: int
     period: WorkingPeriod
@@ -137,50 +144,236 @@ def compute_entry_hash(entry: dict) -> str:
     """
     Hash a log entry deterministically (excluding its own hash).
     """
-    entry_copy = entry.copy()
-    entry_copy.pop("ph", None)
-    canonical = json.dumps(entry_copy, sort_keys=True, separators=(",", ":"))
-    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
-
+    return entry_digest(entry).hex()
 
-def validate_log_integrity(scene) -> bool:
 
+def validate_log_integrity(scene, deep: bool = False) -> bool:
+    """
+    Check the genesis hash and the hash chain of the runtime logs.
+
+    The chain is checked against the digests cached when each entry was
+    appended or loaded. Entries already verified in this runtime (the
+    verified-prefix watermark) are skipped, so repeated validations only
+    check new entries. With deep=True the whole log is checked again and
+    every entry is re-hashed (see verify_log_chain), which also catches
+    entries modified in memory after they were appended.
+    """
     logs = runtime._runtime_logs_raw
     if not logs:
         return True
 
-    # -----------------------------------------
-    # 1. Validate Genesis Log
-    # -----------------------------------------
-    genesis = logs[0]
-
     expected_genesis = generate_genesis_key(
         teacher_key=scene.teacher_key,
         student_id=scene.student_id,
     )
 
-    if genesis.get("ph") != expected_genesis:
-        return False
+    # -----------------------------------------
+    # 1. Resume from the verified prefix
+    # -----------------------------------------
+    verified = runtime._log_verified_count
+    resume = (
+        not deep
+        and 0 < verified <= len(logs)
+        and runtime._log_verified_genesis == expected_genesis
+        and runtime._log_verified_hash == logs.entry_hash(verified - 1)
+    )
 
-    expected_prev = compute_entry_hash(genesis)
+    # -----------------------------------------
+    # 2. Validate Genesis Log
+    # -----------------------------------------
+    if resume:
+        start = verified
+    else:
+        runtime.reset_log_verification()
+        if logs.prev_hash(0) != expected_genesis:
+            return False
+        start = 1
 
     # -----------------------------------------
-    # 2. Validate Chain
+    # 3. Validate Chain
     # -----------------------------------------
-    for entry in logs[1:]:
-        if entry.get("ph") != expected_prev:
+    broken = logs.find_chain_break(start)
+    if broken is not None:
+        print(f"[Logging] Hash chain broken at entry {broken}")
+        return False
+
+    if deep:
+        if not verify_log_chain(scene)["valid"]:
             return False
+        if verify_log_checkpoints() is not None:
+            return False
+
+    runtime.mark_log_verified(len(logs), logs.entry_hash(-1), expected_genesis)
+    return True
+
+
+def verify_log_chain(scene) -> ChainVerifyResult:
+    """
+    Deep-verify the runtime logs: every entry is re-hashed and the chain
+    is checked in one pass. Reports the first broken index.
+    """
+    result = verify_chain(
+        runtime._runtime_logs_raw,
+        generate_genesis_key(
+            teacher_key=scene.teacher_key,
+            student_id=scene.student_id,
+        ),
+    )
+    if not result["valid"]:
+        print(
+            f"[Logging] Chain verification failed at entry {result['first_broken']} ({result['reason']})"
+        )
+    return result
+
+
+# --------------------------------------------------
+# MERKLE CHECKPOINTS
+# --------------------------------------------------
+
+# Entries that close a checkpoint, so every session gets its own roots
+CHECKPOINT_ACTIONS = ("Session Started", "Session Stopped")
+
+
+def update_log_checkpoints() -> None:
+    """
+    Checkpoint the runtime logs after the last checkpoint: a checkpoint is
+    closed after every LOG_CHECKPOINT_INTERVAL entries and after each
+    session start/stop entry.
+    """
+    logs = runtime._runtime_logs_raw
+    checkpoints = runtime._log_checkpoints
+
+    if checkpoints and checkpoints[-1]["end"] > len(logs):
+        # Log was replaced by a shorter one
+        checkpoints.clear()
+
+    start = checkpoints[-1]["end"] if checkpoints else 0
+    for i in range(start, len(logs)):
+        if (
+            i + 1 - start < runtime.LOG_CHECKPOINT_INTERVAL
+            and logs.action(i) not in CHECKPOINT_ACTIONS
+        ):
+            continue
+        checkpoint = make_checkpoint(
+            logs.digests(start, i + 1), start, checkpoints[-1] if checkpoints else None
+        )
+        checkpoints.append(checkpoint)
+        start = i + 1
+
+
+def verify_log_checkpoints(first: int = 0) -> Optional[int]:
+    """
+    Recompute the Merkle roots of checkpoints[first:] from the runtime logs
+    and check the checkpoint chain. Checkpoints cover independent ranges, so
+    any subset can be verified on its own.
+
+    :return: Position of the first bad checkpoint, or None if all match
+    """
+    logs = runtime._runtime_logs_raw
+    checkpoints = runtime._log_checkpoints
+
+    broken = find_checkpoint_chain_break(checkpoints)
+    if broken is not None:
+        print(f"[Logging] Checkpoint chain broken at checkpoint {broken}")
+        return broken
+
+    for checkpoint in checkpoints[first:]:
+        if checkpoint["end"] > len(logs):
+            print(f"[Logging] Checkpoint {checkpoint['index']} covers missing entries")
+            return checkpoint["index"]
+        expected = make_checkpoint(
+            logs.digests(checkpoint["start"], checkpoint["end"]), checkpoint["start"]
+        )
+        if expected["root"] != checkpoint["root"]:
+            print(f"[Logging] Checkpoint {checkpoint['index']} root does not match")
+            return checkpoint["index"]
+
+    return None
+
+
+def verify_log_tail(checkpoints: int = 1) -> bool:
+    """
+    Verify only the latest work: the last few checkpoints, the entries after
+    them, and the checkpoint chain itself (which hashes roots, not entries).
+    """
+    logs = runtime._runtime_logs_raw
+    update_log_checkpoints()
+    stored = runtime._log_checkpoints
 
-        expected_prev = compute_entry_hash(entry)
+    first = max(len(stored) - checkpoints, 0)
+    if verify_log_checkpoints(first) is not None:
+        return False
 
+    start = stored[first]["start"] if first < len(stored) else 0
+    broken = logs.find_chain_break(max(start, 1))
+    if broken is not None:
+        print(f"[Logging] Hash chain broken at entry {broken}")
+        return False
     return True
 
 
+def get_log_inclusion_proof(index: int) -> Optional[Dict[str, Any]]:
+    """
+    Prove that one entry is part of a checkpoint without the rest of the log.
+    Returns None if the entry is not covered by a checkpoint yet.
+
+    The proof holds the entry hash, the checkpoint and the sibling hashes
+    (hex) from the entry up to the checkpoint root.
+    """
+    logs = runtime._runtime_logs_raw
+    update_log_checkpoints()
+    checkpoint = find_checkpoint(runtime._log_checkpoints, index)
+    if checkpoint is None:
+        return None
+
+    proof = merkle_proof(
+        logs.digests(checkpoint["start"], checkpoint["end"]),
+        index - checkpoint["start"],
+    )
+    return {
+        "entry": index,
+        "hash": logs.entry_hash(index),
+        "checkpoint": dict(checkpoint),
+        "proof": [["L" if left else "R", sibling.hex()] for left, sibling in proof],
+    }
+
+
+def verify_log_inclusion_proof(proof: Dict[str, Any]) -> bool:
+    """Check a proof from get_log_inclusion_proof against its checkpoint root."""
+    steps = [(side == "L", bytes.fromhex(sibling)) for side, sibling in proof["proof"]]
+    return verify_inclusion(
+        bytes.fromhex(proof["hash"]),
+        steps,
+        bytes.fromhex(proof["checkpoint"]["root"]),
+    )
+
+
 # --------------------------------------------------
 # EXPORT
 # --------------------------------------------------
 
 
+def write_export_json(export: ExportLogsResult, f: TextIO) -> None:
+    """
+    Write an export as json.dump(export, f, indent=2) would, streaming the
+    log entries from the snapshot instead of building a list first.
+    """
+    f.write('{\n  "data": [')
+    count = 0
+    for entry in export["data"]:
+        f.write(",\n    " if count else "\n    ")
+        f.write(json.dumps(entry, indent=2).replace("\n", "\n    "))
+        count += 1
+    f.write("\n  ]" if count else "]")
+
+    for key, value in export.items():
+        if key == "data":
+            continue
+        f.write(f",\n  {json.dumps(key)}: ")
+        f.write(json.dumps(value, indent=2).replace("\n", "\n  "))
+    f.write("\n}")
+
+
 def export_decrypted_logs(scene) -> ExportLogsResult:
 
     finalize_and_commit_log()
@@ -189,13 +382,12 @@ def export_decrypted_logs(scene) -> ExportLogsResult:
         print("[EXPORT DECRYPTED LOGS] Reloading logs")
         load_logs_from_scene(scene)
 
-    if runtime.is_log_dirty():
-        save_logs_to_scene(scene)
+    save_logs_to_scene(scene, wait=True)
 
     valid = validate_log_integrity(scene)
 
     return {
-        "data": runtime._runtime_logs_raw.copy(),
+        "data": runtime._runtime_logs_raw.snapshot(),
         "status": "valid" if valid else "tampered",
         "total_working_time": get_total_work_time(),
         "period": get_working_period(),
@@ -235,7 +427,7 @@ def add_log(
     # Determine previous hash
     if runtime._runtime_logs_raw:
         prev_entry = runtime._runtime_logs_raw[-1]
-        prev_hash = compute_entry_hash(prev_entry)
+        prev_hash = runtime._runtime_logs_raw.entry_hash(-1)
     else:
         prev_entry = None
         prev_hash = generate_genesis_key(
@@ -264,12 +456,15 @@ def add_log(
     }
 
     runtime._runtime_logs_raw.append(entry)
+    update_log_checkpoints()
     runtime.mark_log_dirty()
     print(f"[Majik Log] [New Log] {action_type} -> {object_name} ({object_type})")
-    # --- Recovery save ---
+    # --- Recovery save (journal append) ---
     try:
-        recovery_instance = Recovery()
-        recovery_instance.save(scene=scene, mode=get_security_mode(scene))
+        # No journal until a session gives the scene a project id
+        recovery = get_recovery(scene)
+        if recovery is not None:
+            recovery.save(scene=scene, mode=get_security_mode(scene))
     except Exception as e:
         print(f"[Recovery] Failed to save logs: {e}")
 
@@ -425,12 +620,10 @@ def create_genesis_log(scene, genesis_hash: str):
     }
 
     # Store in runtime logs
-    if not hasattr(runtime, "_runtime_logs_raw"):
-        runtime._runtime_logs_raw = []
-
     runtime._runtime_logs_raw.append(entry)
+    runtime.mark_log_dirty()
 
-    save_logs_to_scene(scene)
+    save_logs_to_scene(scene, wait=True)
 
     return genesis_hash
 
@@ -464,28 +657,46 @@ def validate_genesis_log(scene, teacher_key: str, student_id: str) -> bool:
     return first_entry["ph"] == expected_genesis
 
 
-def save_logs_to_scene(scene):
+def save_logs_to_scene(scene, *, wait: bool = False):
     """
     Save the current runtime logs into a Blender Text datablock using SessionLogController.
-    """
-    print("[Logging] Saving runtime logs to Text datablock")
 
-    # Print raw logs
-    for log in runtime._runtime_logs_raw:
-        print(log)
-
-    SessionLogController.save_logs_to_text(
-        scene=scene, raw_logs=runtime._runtime_logs_raw
+    Requests are coalesced and skipped when nothing changed; encoding happens
+    on the log writer thread and the Text is written shortly after. Pass
+    wait=True when the Text must be current on return (save_pre).
+    """
+    print(
+        f"[Logging] Saving runtime logs to Text datablock ({len(runtime._runtime_logs_raw)} entries)"
     )
 
+    update_log_checkpoints()
+    if wait:
+        flush_log_writes(scene)
+    else:
+        schedule_log_save(scene)
+
 
 def load_logs_from_scene(scene):
     """
     Load session logs from Text datablock into runtime._runtime_logs_raw
+
+    Pending and in-flight background writes are flushed first, so entries
+    not yet in the Text are never replaced by its older content. When the
+    runtime already holds the whole saved log, it is kept as is.
     """
+    flush_log_writes(scene)
+
+    if runtime._runtime_logs_raw and not needs_log_write():
+        print("[Logging] Runtime already holds the session log; not reloading")
+        rebuild_runtime_cache_from_scene(scene)
+        return runtime._runtime_logs_raw
+
     print("[Logging] Loading logs from Text datablock")
     logs = SessionLogController.load_logs_from_text(scene=scene)
-    runtime._runtime_logs_raw = logs
+    runtime._runtime_logs_raw.replace(logs)
+    runtime.reset_log_verification()
+    update_log_checkpoints()
+    spill_persisted_logs(scene)
     rebuild_runtime_cache_from_scene(scene)
     return logs
 
@@ -747,6 +958,9 @@ def log_simple_action(obj):
 # --------------------------------------------------
 def on_depsgraph_update(scene, depsgraph):
     """Optimized depsgraph update handler for logging mesh, curve, and armature changes."""
+    # Keep the per-object stats current even while no session is running
+    get_stats_engine().on_depsgraph_update(scene, depsgraph)
+
     if bpy.app.background or runtime._timer_start is None:
         return
 
@@ -890,6 +1104,10 @@ def log_session_start(reason: str = "user_start"):
     scene = bpy.context.scene
     load_logs_from_scene(scene)
     load_timer_from_scene(scene)
+    try:
+        start_project_session(scene)
+    except Exception as e:
+        print(f"[Recovery] Could not start the recovery journal: {e}")
 
     log_session_event(
         started=True,
@@ -906,29 +1124,17 @@ def log_session_stop(reason: str = "user_stop"):
         reason=reason,
     )
     scene = bpy.context.scene
-    save_logs_to_scene(scene)
+    save_logs_to_scene(scene, wait=True)
     save_timer_to_scene(scene)
 
 
 def get_scene_stats(scene) -> SceneStats:
     """
-    Returns the current scene stats, respecting edit mode and armature edit mode.
-    Uses caching to avoid frequent recomputation.
+    Returns the current scene stats: vertices and faces of the evaluated
+    meshes and the number of mesh objects, respecting edit modes
+    (see SceneStatsManager.get_scene_stats).
     """
-    stats_str = scene.statistics(bpy.context.view_layer)
-
-    scene = bpy.context.scene
-    _scene_stats_manager = SceneStatsManager(scene)
-
-
-    # If we are in edit mode or armature edit mode, use last stored stats
-    if _scene_stats_manager.is_edit_mode(
-        stats_str
-    ) or _scene_stats_manager.is_armature_edit_mode(stats_str):
-        return _scene_stats_manager._last_scene_stats
-
-    # Otherwise, compute fresh stats
-    return _scene_stats_manager.get_scene_stats(scene)
+    return get_stats_manager().get_scene_stats(scene)
 
 
 def get_total_scene_stats(scene) -> SceneStats:
@@ -936,40 +1142,7 @@ def get_total_scene_stats(scene) -> SceneStats:
     Computes total vertices, faces, and objects in the scene,
     INCLUDING modifiers (evaluated mesh).
     """
-    now = time.time()
-    last = getattr(runtime, "_last_total_stats_time", 0)
-
-    if now - last < 1.0:
-        return runtime._last_total_scene_stats
-
-    depsgraph = bpy.context.evaluated_depsgraph_get()
-
-    total_verts = 0
-    total_faces = 0
-    total_objects = 0
-
-    for obj in scene.objects:
-        if obj.type != "MESH":
-            continue
-
-        eval_obj = obj.evaluated_get(depsgraph)
-        eval_mesh = eval_obj.to_mesh(
-            preserve_all_data_layers=False, depsgraph=depsgraph
-        )
-
-        if eval_mesh:
-            total_verts += len(eval_mesh.vertices)
-            total_faces += len(eval_mesh.polygons)
-            total_objects += 1
-
-            # IMPORTANT: free evaluated mesh
-            eval_obj.to_mesh_clear()
-
-    stats = {"v": total_verts, "f": total_faces, "o": total_objects}
-
-    runtime._last_total_scene_stats = stats
-    runtime._last_total_stats_time = now
-    return stats
+    return get_stats_engine().stats(scene)
 
 
 def get_total_work_time() -> int:
@@ -981,11 +1154,8 @@ def get_total_work_time() -> int:
     if not logs or len(logs) < 2:
         return 0
 
-    start_item = logs[1]
-    end_item = logs[-1]
-
-    start_time = start_item.get("t", 0)
-    end_time = end_item.get("t", 0)
+    start_time = logs.timestamp(1)
+    end_time = logs.timestamp(-1)
 
     total_seconds = round(max(0, end_time - start_time))
     return int(total_seconds)
@@ -1003,11 +1173,8 @@ def get_working_period() -> WorkingPeriod:
     if not logs or len(logs) < 2:
         return {"start": "", "end": ""}
 
-    start_item = logs[1]
-    end_item = logs[-1]
-
-    start_iso = datetime.fromtimestamp(start_item.get("t", 0)).isoformat()
-    end_iso = datetime.fromtimestamp(end_item.get("t", 0)).isoformat()
+    start_iso = datetime.fromtimestamp(logs.timestamp(1)).isoformat()
+    end_iso = datetime.fromtimestamp(logs.timestamp(-1)).isoformat()
 
     return {"start": start_iso, "end": end_iso}
 
@@ -1048,8 +1215,13 @@ def on_save_pre(filepath: str):
         object_type="SYSTEM",
         action_details={"filepath": filepath},
     )
-    save_logs_to_scene(scene)
+    save_logs_to_scene(scene, wait=True)
     save_timer_to_scene(scene)
+    recovery = get_recovery(scene)
+    if recovery is not None:
+        recovery.sync()
+        # The .blend being written holds the project id from now on
+        forget_pending_project(scene)
     print(f"[Majik] Logs and timer saved before saving {filepath}")
 
 
@@ -1058,19 +1230,34 @@ def on_save_pre(filepath: str):
 # --------------------------------------------------
 
 
+def on_undo_redo(scene, *args):
+    # Undo can swap any object's data without a depsgraph update per object
+    reset_stats_engine()
+
+
 def register_logging_handlers():
     if on_depsgraph_update not in bpy.app.handlers.depsgraph_update_post:
         bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update)
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if on_undo_redo not in handlers:
+            handlers.append(on_undo_redo)
     if log_import_post not in bpy.app.handlers.blend_import_post:
         bpy.app.handlers.blend_import_post.append(log_import_post)
     if on_save_pre not in bpy.app.handlers.save_pre:
         bpy.app.handlers.save_pre.append(on_save_pre)
+    register_recovery_timer()
 
 
 def unregister_logging_handlers():
     if on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
         bpy.app.handlers.depsgraph_update_post.remove(on_depsgraph_update)
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if on_undo_redo in handlers:
+            handlers.remove(on_undo_redo)
     if log_import_post in bpy.app.handlers.blend_import_post:
         bpy.app.handlers.blend_import_post.remove(log_import_post)
     if on_save_pre in bpy.app.handlers.save_pre:
         bpy.app.handlers.save_pre.remove(on_save_pre)
+    unregister_recovery_timer()
+    close_recovery()
+    shutdown_log_writer()
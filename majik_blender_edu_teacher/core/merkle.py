@@ -0,0 +1,173 @@
+"""
+Merkle checkpoints over the action-log hash chain.
+
+The log is cut into consecutive ranges [start, end). Each range gets a
+checkpoint holding the Merkle root of the entry digests in it (the same
+digests the "ph" chain uses) and a chain hash linking it to the previous
+checkpoint:
+
+    leaf   = sha256(0x00 + entry digest)
+    node   = sha256(0x01 + left + right)        odd nodes move up unchanged
+    chain  = sha256(0x02 + previous chain + root + u64 start + u64 end)
+
+Proving one entry needs only the log2(n) sibling hashes of its range, and
+ranges can be verified independently of each other. Nothing in this module
+touches bpy.
+"""
+
+import hmac
+import struct
+import hashlib
+from typing import List, Optional, Sequence, Tuple, TypedDict
+
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+CHAIN_PREFIX = b"\x02"
+
+# Chain hash "before" the first checkpoint
+GENESIS_CHAIN = bytes(32)
+
+_RANGE = struct.Struct("<QQ")
+
+
+class Checkpoint(TypedDict):
+    index: int  # checkpoint sequence number
+    start: int  # first entry covered
+    end: int  # one past the last entry covered
+    root: str  # Merkle root of the entry digests in [start, end), hex
+    chain: str  # chain hash linking to the previous checkpoint, hex
+
+
+# (sibling is on the left, sibling hash)
+ProofStep = Tuple[bool, bytes]
+
+
+# --------------------------------------------------
+# TREE
+# --------------------------------------------------
+
+
+def leaf_hash(digest: bytes) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + digest).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def _tree_levels(digests: Sequence[bytes]) -> List[List[bytes]]:
+    if not digests:
+        raise ValueError("Cannot build a Merkle tree without entries")
+
+    level = [leaf_hash(digest) for digest in digests]
+    levels = [level]
+    while len(level) > 1:
+        parent = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parent.append(level[-1])
+        level = parent
+        levels.append(level)
+    return levels
+
+
+def merkle_root(digests: Sequence[bytes]) -> bytes:
+    """Merkle root of a non-empty sequence of entry digests."""
+    return _tree_levels(digests)[-1][0]
+
+
+def merkle_proof(digests: Sequence[bytes], index: int) -> List[ProofStep]:
+    """
+    Inclusion proof for digests[index]: the sibling hashes from the leaf up
+    to the root.
+    """
+    if not 0 <= index < len(digests):
+        raise IndexError("proof index out of range")
+
+    proof: List[ProofStep] = []
+    for level in _tree_levels(digests)[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append((sibling < index, level[sibling]))
+        index //= 2
+    return proof
+
+
+def verify_inclusion(digest: bytes, proof: Sequence[ProofStep], root: bytes) -> bool:
+    """Whether an entry digest is part of the tree with the given root."""
+    node = leaf_hash(digest)
+    for sibling_is_left, sibling in proof:
+        node = node_hash(sibling, node) if sibling_is_left else node_hash(node, sibling)
+    return hmac.compare_digest(node, root)
+
+
+# --------------------------------------------------
+# CHECKPOINTS
+# --------------------------------------------------
+
+
+def chain_hash(previous: bytes, root: bytes, start: int, end: int) -> bytes:
+    return hashlib.sha256(
+        CHAIN_PREFIX + previous + root + _RANGE.pack(start, end)
+    ).digest()
+
+
+def make_checkpoint(
+    digests: Sequence[bytes], start: int, previous: Optional[Checkpoint] = None
+) -> Checkpoint:
+    """
+    Checkpoint the entries [start, start + len(digests)), chained to the
+    previous checkpoint.
+    """
+    end = start + len(digests)
+    root = merkle_root(digests)
+    previous_chain = bytes.fromhex(previous["chain"]) if previous else GENESIS_CHAIN
+    return {
+        "index": previous["index"] + 1 if previous else 0,
+        "start": start,
+        "end": end,
+        "root": root.hex(),
+        "chain": chain_hash(previous_chain, root, start, end).hex(),
+    }
+
+
+def find_checkpoint_chain_break(checkpoints: Sequence[Checkpoint]) -> Optional[int]:
+    """
+    Position of the first checkpoint that is not contiguous with, or not
+    chained to, the one before it; None if the chain holds. Only the
+    checkpoints themselves are hashed, not the entries.
+    """
+    previous_chain = GENESIS_CHAIN
+    expected_start = 0
+
+    for position, checkpoint in enumerate(checkpoints):
+        start, end = checkpoint["start"], checkpoint["end"]
+        if (
+            checkpoint["index"] != position
+            or start != expected_start
+            or end <= start
+        ):
+            return position
+
+        chain = chain_hash(previous_chain, bytes.fromhex(checkpoint["root"]), start, end)
+        if chain.hex() != checkpoint["chain"]:
+            return position
+
+        previous_chain = chain
+        expected_start = end
+
+    return None
+
+
+def find_checkpoint(checkpoints: Sequence[Checkpoint], index: int) -> Optional[Checkpoint]:
+    """The checkpoint covering an entry index, or None if it is not covered yet."""
+    lo, hi = 0, len(checkpoints)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if checkpoints[mid]["end"] <= index:
+            lo = mid + 1
+        else:
+            hi = mid
+    if lo < len(checkpoints) and checkpoints[lo]["start"] <= index:
+        return checkpoints[lo]
+    return None
@@ -1,35 +1,451 @@
 # recovery.py
 import os
+import glob
+import json
+import mmap
+import time
+import uuid
+import base64
+import struct
+import hashlib
 import bpy  # type: ignore
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Tuple, TypedDict
 
 from ..core import runtime
-from ..core.crypto import encrypt_metadata, decrypt_metadata
+from ..core.crypto import (
+    decrypt_metadata,
+    derive_subkey,
+    fernet_key_from_string,
+)
+from ..core.constants import SCENE_PROJECT_ID
+from ..core.text.log_binary import encode_entries, decode_entries
+
+
+# --------------------------------------------------
+# JOURNAL FORMAT
+# --------------------------------------------------
+
+# The recovery file is an append-only journal:
+#
+#   b"MJKJ" u8 version
+#   header (v2): u64 entry count, 32-byte hash of the last entry, f64 its timestamp
+#   records: u32 length, u8 kind, u64 start, u32 count, then `length` bytes
+#
+# A record body is a binary log payload (log_binary.py) holding `count`
+# entries starting at index `start`, sealed with AES-GCM (record header as
+# AAD, 12-byte nonce first) or XOR-obfuscated in XOR mode. A SNAPSHOT holds
+# the whole log; ENTRIES records extend it. A torn or unreadable record
+# ends the journal, so a crash recovers everything up to the last fsync.
+#
+# The fixed-size header is rewritten in place after every record, so a
+# restore can compare it with the scene's log before decrypting anything.
+
+JOURNAL_MAGIC = b"MJKJ"
+JOURNAL_VERSION = 2
+JOURNAL_PREFIX = JOURNAL_MAGIC + bytes([JOURNAL_VERSION])
+
+RECORD_SNAPSHOT = 1
+RECORD_ENTRIES = 2
+
+_HEADER = struct.Struct("<Q32sd")
+_RECORD = struct.Struct("<IBQI")
+
+# Journal files are binary; os.open needs this on Windows
+_O_BINARY = getattr(os, "O_BINARY", 0)
+
+JOURNAL_KEY_INFO = b"majik-recovery-journal"
+NONCE_SIZE = 12
+
+
+class JournalHeader(TypedDict):
+    count: int  # entries in the journal
+    last_hash: str  # entry hash of the last entry, hex
+    last_time: float  # timestamp of the last entry
+
+
+class JournalCipher:
+    """
+    Seals journal records. AES mode uses AES-GCM with a subkey of the
+    (cached) PBKDF2-derived recovery key; XOR mode mirrors xor_obfuscate.
+    """
+
+    def __init__(self, key: str, salt_bytes: bytes, mode: str):
+        self.mode = mode
+        if mode == "AES":
+            from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+            hashed_key = hashlib.sha256(key.encode()).hexdigest()
+            base_key = base64.urlsafe_b64decode(
+                fernet_key_from_string(hashed_key, salt_bytes)
+            )
+            self.aead = AESGCM(derive_subkey(base_key, JOURNAL_KEY_INFO))
+        elif mode == "XOR":
+            self.xor_key = hashlib.sha256(key.encode()).digest()
+        else:
+            raise ValueError(f"Unknown encryption mode: {mode}")
+
+    def _xor(self, data: bytes) -> bytes:
+        key = self.xor_key
+        return bytes(b ^ key[i % len(key)] for i, b in enumerate(data))
+
+    def seal(self, plaintext: bytes, header: bytes) -> bytes:
+        if self.mode == "XOR":
+            return self._xor(plaintext)
+        nonce = os.urandom(NONCE_SIZE)
+        return nonce + self.aead.encrypt(nonce, plaintext, header)
+
+    def open(self, sealed: bytes, header: bytes) -> bytes:
+        if self.mode == "XOR":
+            return self._xor(sealed)
+        return self.aead.decrypt(sealed[:NONCE_SIZE], sealed[NONCE_SIZE:], header)
+
+
+def _pack_record(
+    cipher: JournalCipher, kind: int, start: int, entries: List[Dict[str, Any]]
+) -> bytes:
+    plaintext = encode_entries(entries)
+    # The sealed length is known before sealing: nonce + ciphertext + tag
+    overhead = 0 if cipher.mode == "XOR" else NONCE_SIZE + 16
+    header = _RECORD.pack(len(plaintext) + overhead, kind, start, len(entries))
+    return header + cipher.seal(plaintext, header)
+
+
+def _pack_header(count: int, last_hash: Optional[str], last_time: float) -> bytes:
+    return _HEADER.pack(
+        count, bytes.fromhex(last_hash) if last_hash else bytes(32), last_time
+    )
+
+
+def read_journal_header(data) -> JournalHeader:
+    """
+    Read the fixed-size journal header.
+    :raises ValueError: If the data is not a journal
+    """
+    end = len(JOURNAL_PREFIX) + _HEADER.size
+    if data[: len(JOURNAL_MAGIC)] != JOURNAL_MAGIC or len(data) < end:
+        raise ValueError("Not a recovery journal")
+    version = data[len(JOURNAL_MAGIC)]
+    if version != JOURNAL_VERSION:
+        raise ValueError(f"Unsupported recovery journal version {version}")
+
+    count, last_hash, last_time = _HEADER.unpack(data[len(JOURNAL_PREFIX) : end])
+    return {"count": count, "last_hash": last_hash.hex(), "last_time": last_time}
+
+
+def _iter_records(data) -> Iterator[Tuple[int, bytes, int, int, int]]:
+    """
+    Yield (position, record header, kind, start, count) for every complete
+    record, reading only the record headers.
+    """
+    pos = len(JOURNAL_PREFIX) + _HEADER.size
+    while pos + _RECORD.size <= len(data):
+        header = bytes(data[pos : pos + _RECORD.size])
+        length, kind, start, count = _RECORD.unpack(header)
+        if pos + _RECORD.size + length > len(data):
+            print(f"[Recovery] Journal ends with a torn record at byte {pos}")
+            return
+        yield pos, header, kind, start, count
+        pos += _RECORD.size + length
+
+
+def read_journal_tail(
+    data, cipher: JournalCipher, from_index: int = 0
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Replay the journal entries from from_index on. Records that end before
+    from_index are skipped without being decrypted.
+
+    :param data: The journal (bytes, or an mmap of the file)
+    :return: The entries [from_index, end) and the number of records decrypted
+    :raises ValueError: If the data is not a journal
+    """
+    read_journal_header(data)
+
+    # Only records after the last snapshot matter
+    records = list(_iter_records(data))
+    first = 0
+    for position, record in enumerate(records):
+        if record[2] == RECORD_SNAPSHOT:
+            first = position
+
+    tail: List[Dict[str, Any]] = []
+    total = 0
+    decrypted = 0
+
+    for pos, header, kind, start, count in records[first:]:
+        follows = (kind == RECORD_SNAPSHOT and start == 0) or (
+            kind == RECORD_ENTRIES and start == total
+        )
+        if not follows:
+            print(f"[Recovery] Journal record at byte {pos} does not follow the log")
+            break
+
+        if start + count > from_index:
+            length = _RECORD.unpack(header)[0]
+            body = bytes(data[pos + _RECORD.size : pos + _RECORD.size + length])
+            try:
+                entries = decode_entries(cipher.open(body, header))
+            except Exception as e:
+                print(f"[Recovery] Journal record at byte {pos} is unreadable: {e}")
+                break
+            if len(entries) != count:
+                print(f"[Recovery] Journal record at byte {pos} has a wrong entry count")
+                break
+            tail.extend(entries[max(from_index - start, 0) :])
+            decrypted += 1
+
+        total = start + count
+
+    return tail, decrypted
+
+
+def read_journal(data, cipher: JournalCipher) -> Tuple[List[Dict[str, Any]], int]:
+    """Replay a whole journal. Returns the logs and the records decrypted."""
+    return read_journal_tail(data, cipher, 0)
+
+
+# --------------------------------------------------
+# FILES
+# --------------------------------------------------
+
+RECOVERY_EXTENSION = ".mjkb"
+PENDING_INDEX_NAME = "pending_sessions.json"
+
+
+class RecoveryStats(TypedDict):
+    path: str  # journal of the current project
+    size: int  # its size in bytes
+    records: int  # records in it
+    entries: int  # log entries in it
+    last_compaction: Optional[float]  # time.time() of the last compaction
+    files: int  # journals kept for all projects
+    total_size: int  # their combined size in bytes
+
+
+def _student_tag(scene: bpy.types.Scene) -> str:
+    return hashlib.sha256(scene.student_id.encode("utf-8")).hexdigest()[:12]
+
+
+def get_project_id(scene: bpy.types.Scene) -> Optional[str]:
+    """
+    Id of the student's project, stored in the scene (and so in the .blend)
+    once a session has started. Recovery journals are keyed by it. Scenes
+    without one (e.g. a teacher's file before distribution) keep no journal.
+    """
+    return scene.get(SCENE_PROJECT_ID) or None
+
+
+def start_project_session(scene: bpy.types.Scene) -> str:
+    """
+    Make sure the scene has a project id for the current student, minting
+    one ("<student tag>-<uuid>") if it has none or it was minted for
+    another student. A new id is recorded in the pending index right away,
+    so its journal can be found after a crash even if the .blend holding
+    the id was never saved.
+    """
+    tag = _student_tag(scene)
+    project_id = get_project_id(scene)
+    if project_id and project_id.startswith(tag + "-"):
+        return project_id
+
+    project_id = f"{tag}-{uuid.uuid4().hex}"
+    scene[SCENE_PROJECT_ID] = project_id
+
+    index = _read_pending_index()
+    index[project_id] = {"student": tag, "blend": bpy.data.filepath, "time": time.time()}
+    _write_pending_index(index)
+    print(f"[Recovery] New recovery journal id {project_id}")
+    return project_id
+
+
+def adopt_pending_project_id(scene: bpy.types.Scene) -> Optional[str]:
+    """
+    For a scene without a project id, take the id of the newest pending
+    session of the same student and .blend whose journal still exists,
+    i.e. a session that crashed before its id was saved.
+    """
+    project_id = get_project_id(scene)
+    if project_id:
+        return project_id
+
+    tag = _student_tag(scene)
+    candidates = [
+        (info.get("time", 0.0), pending_id)
+        for pending_id, info in _read_pending_index().items()
+        if info.get("student") == tag
+        and info.get("blend") == bpy.data.filepath
+        and os.path.exists(_journal_path(pending_id))
+    ]
+    if not candidates:
+        return None
+
+    project_id = max(candidates)[1]
+    scene[SCENE_PROJECT_ID] = project_id
+    print(f"[Recovery] Resuming unsaved session journal {project_id}")
+    return project_id
+
+
+def forget_pending_project(scene: bpy.types.Scene) -> None:
+    """Drop the scene's id from the pending index once the .blend holds it."""
+    project_id = get_project_id(scene)
+    index = _read_pending_index()
+    if project_id and index.pop(project_id, None) is not None:
+        _write_pending_index(index)
+
+
+def _pending_index_path() -> str:
+    return os.path.join(recovery_dir(), PENDING_INDEX_NAME)
+
+
+def _read_pending_index() -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(_pending_index_path(), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        return index if isinstance(index, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_pending_index(index: Dict[str, Dict[str, Any]]) -> None:
+    # Keep the newest entries whose journal may still be needed
+    newest = sorted(index.items(), key=lambda item: item[1].get("time", 0.0), reverse=True)
+    index = dict(newest[: runtime.RECOVERY_PENDING_LIMIT])
+
+    path = _pending_index_path()
+    temp = path + ".tmp"
+    try:
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path)
+    except OSError as e:
+        print(f"[Recovery] Could not write the pending session index: {e}")
+
+
+def _journal_path(project_id: str) -> str:
+    return os.path.join(recovery_dir(), project_id + RECOVERY_EXTENSION)
+
+
+def recovery_dir() -> str:
+    """Directory holding the recovery journals of every project."""
+    try:
+        package = __name__.rpartition(".core.")[0]
+        return bpy.utils.extension_path_user(package, path="recovery", create=True)
+    except Exception:
+        # Not installed as an extension
+        path = os.path.join(os.path.expanduser("~"), ".majik_recovery")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+
+def rotate_recovery_files(keep: Optional[str] = None) -> int:
+    """
+    Delete the least recently written journals until at most
+    RECOVERY_MAX_FILES remain and they use at most RECOVERY_MAX_TOTAL_BYTES.
+    The journal at `keep` is never deleted.
+
+    :return: Number of files deleted
+    """
+    files = []
+    for path in glob.glob(os.path.join(recovery_dir(), "*" + RECOVERY_EXTENSION)):
+        try:
+            info = os.stat(path)
+        except OSError:
+            continue
+        files.append((info.st_mtime, info.st_size, path))
+    files.sort(reverse=True)
+
+    kept = 0
+    total = 0
+    deleted = 0
+    for _, size, path in files:
+        is_kept = keep is not None and os.path.abspath(path) == os.path.abspath(keep)
+        if is_kept or (
+            kept < runtime.RECOVERY_MAX_FILES
+            and total + size <= runtime.RECOVERY_MAX_TOTAL_BYTES
+        ):
+            kept += 1
+            total += size
+            continue
+        try:
+            os.remove(path)
+            deleted += 1
+            print(f"[Recovery] Rotated out old recovery file {path}")
+        except OSError as e:
+            print(f"[Recovery] Could not remove {path}: {e}")
+    return deleted
+
+
+# --------------------------------------------------
+# RECOVERY
+# --------------------------------------------------
 
 
 class Recovery:
     """
     Handles external encrypted recovery logs for Majik Blender sessions.
-    Uses AES (Fernet) or XOR fallback based on availability.
+    Uses AES (AES-GCM journal records) or XOR fallback based on availability.
+
+    The recovery file is a journal: each save appends only the entries
+    logged since the previous save. Compacting it into a single snapshot
+    re-encodes the whole log, so only the idle timer (on_idle()) does it;
+    a save past RECOVERY_COMPACT_EVERY records or RECOVERY_MAX_FILE_BYTES
+    just flags it. Keep one instance alive (see get_recovery()) so saves
+    stay constant-cost.
     """
 
-    def __init__(self, filename: Optional[str] = None):
+    def __init__(self, filename: Optional[str] = None, scene: Optional[bpy.types.Scene] = None):
         if filename:
             self.filename = filename
         else:
-            project_path = bpy.data.filepath
-            if project_path:  # If the Blender project has been saved
-                project_dir = os.path.dirname(project_path)
-                project_name = os.path.splitext(os.path.basename(project_path))[0]
-                self.filename = os.path.join(
-                    project_dir, f"{project_name}_recovery.mjkb"
-                )
-            else:  # Fallback to home folder
-                self.filename = os.path.join(
-                    os.path.expanduser("~"), "majik_recovery_log.mjkb"
-                )
+            self.filename = Recovery.default_filename(scene)
+            if self.filename is None:
+                raise RuntimeError("Scene has no project id; start a session first")
         self.salt_bytes = None  # Will be derived from student_id
 
+        self._fd: Optional[int] = None
+        self._cipher: Optional[JournalCipher] = None
+        self._cipher_id: Optional[Tuple[str, bytes, str]] = None
+        self._written = 0  # entries in the journal
+        self._written_hash: Optional[str] = None  # hash of the last one
+        self._records = 0  # records since the last snapshot
+        self._unsynced = 0  # records written since the last fsync
+        self._last_sync = time.monotonic()
+        self._last_write = time.monotonic()
+        self._size = 0  # journal size in bytes, once written this runtime
+        self._file_records = 0  # records in the journal
+        self._last_compaction: Optional[float] = None
+        self._resumable = True  # the journal on disk is not looked at yet
+        self._compact_due = False  # set by save(), handled by on_idle()
+
+    @staticmethod
+    def default_filename(scene: Optional[bpy.types.Scene] = None) -> Optional[str]:
+        """
+        The journal of the scene's project, in the recovery directory, or
+        None while the scene has no project id.
+        """
+        if scene is None:
+            scene = bpy.context.scene
+        project_id = get_project_id(scene)
+        if not project_id:
+            return None
+        return _journal_path(project_id)
+
+    @staticmethod
+    def legacy_filename() -> Optional[str]:
+        """
+        Where a saved project kept its recovery file before journals were
+        keyed by project. (The shared home-folder file is not migrated: it
+        may belong to any project.)
+        """
+        project_path = bpy.data.filepath
+        if not project_path:
+            return None
+        project_dir = os.path.dirname(project_path)
+        project_name = os.path.splitext(os.path.basename(project_path))[0]
+        return os.path.join(project_dir, f"{project_name}_recovery.mjkb")
+
     def _derive_salt(self, scene: bpy.types.Scene) -> bytes:
         """
         Derive a salt for encryption/decryption from student_id
@@ -38,76 +454,416 @@ class Recovery:
             raise RuntimeError("Scene missing student_id for recovery encryption")
         return scene.student_id.encode("utf-8")
 
+    def _get_cipher(self, scene: bpy.types.Scene, mode: str) -> JournalCipher:
+        self.salt_bytes = self._derive_salt(scene)
+        if not self.salt_bytes:
+            raise RuntimeError("Missing student ID hash; cannot encrypt securely")
+
+        cipher_id = (
+            hashlib.sha256(scene.teacher_key.encode()).hexdigest(),
+            self.salt_bytes,
+            mode,
+        )
+        if self._cipher is None or self._cipher_id != cipher_id:
+            # Records under another key would be unreadable; start over
+            self._resumable = self._cipher is None
+            self._written = 0
+            self._cipher = JournalCipher(scene.teacher_key, self.salt_bytes, mode)
+            self._cipher_id = cipher_id
+        return self._cipher
+
+    # --------------------------------------------------
+    # WRITING
+    # --------------------------------------------------
+
     def save(self, scene: bpy.types.Scene, mode: str = "AES") -> None:
         """
-        Save the current runtime logs to an encrypted external file.
+        Journal the runtime log entries added since the last save.
         """
         if not hasattr(runtime, "_runtime_logs_raw") or not runtime._runtime_logs_raw:
             return
 
-        logs: List[Dict[str, Any]] = runtime._runtime_logs_raw.copy()
-        self.salt_bytes = self._derive_salt(scene)
+        logs = runtime._runtime_logs_raw
+        cipher = self._get_cipher(scene, mode)
 
-        encrypted = encrypt_metadata(
-            metadata=logs,
-            key=scene.teacher_key,
-            salt_bytes=self.salt_bytes,
-            mode=mode,
+        if self._resumable:
+            # First save of this runtime: continue the journal on disk
+            self._resumable = False
+            self._resume(logs)
+
+        diverged = self._written > len(logs) or (
+            self._written and logs.entry_hash(self._written - 1) != self._written_hash
         )
+        if diverged:
+            print("[Recovery] Runtime log no longer continues the journal; starting a new one")
+        if diverged or not self._written:
+            self._start_journal()
 
-        with open(self.filename, "w", encoding="utf-8") as f:
-            f.write(encrypted)
+        if self._written == len(logs):
+            return
 
-        print(f"[Recovery] Logs saved to {self.filename} ({len(logs)} entries)")
+        start = self._written
+        # A new journal is encoded straight from an O(1) snapshot
+        entries = logs[start:] if start else logs.snapshot()
+        self._written = len(logs)
+        self._written_hash = logs.entry_hash(-1)
+        self._write(
+            _pack_record(cipher, RECORD_ENTRIES, start, entries),
+            _pack_header(self._written, self._written_hash, logs.timestamp(-1)),
+        )
+        self._records += 1
+        if (
+            self._records >= runtime.RECOVERY_COMPACT_EVERY
+            or self._size >= runtime.RECOVERY_MAX_FILE_BYTES
+        ):
+            # Left to on_idle(); compacting re-encodes the whole log
+            self._compact_due = True
 
-    def restore(
-        self, scene: bpy.types.Scene, mode: str = "AES"
-    ) -> Optional[List[Dict[str, Any]]]:
+    def _resume(self, logs) -> None:
         """
-        Restore runtime logs from the external encrypted recovery file.
-        Returns the log list if successful, else None.
+        Pick up the journal left by an earlier runtime if the runtime log
+        continues it, so saves keep appending to it. Reads record headers
+        only; a torn last record is cut off.
         """
         if not os.path.exists(self.filename):
-            print("[Recovery] No recovery file found")
-            return None
+            return
+        try:
+            with open(self.filename, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    header = read_journal_header(data)
+                    records = list(_iter_records(data))
+        except ValueError as e:
+            print(f"[Recovery] Not resuming journal: {e}")
+            return
 
-        self.salt_bytes = self._derive_salt(scene)
+        if not records:
+            return
+        pos, record, _, start, count = records[-1]
+        total = start + count
+        if (
+            total != header["count"]
+            or total > len(logs)
+            or logs.entry_hash(total - 1) != header["last_hash"]
+        ):
+            return
+
+        snapshot = max(
+            (i for i, rec in enumerate(records) if rec[2] == RECORD_SNAPSHOT), default=0
+        )
+        end = pos + _RECORD.size + _RECORD.unpack(record)[0]
+        self._fd = os.open(self.filename, os.O_WRONLY | _O_BINARY)
+        os.ftruncate(self._fd, end)
+        self._written = total
+        self._written_hash = header["last_hash"]
+        self._records = len(records) - snapshot - 1
+        self._file_records = len(records)
+        self._size = end
+        print(f"[Recovery] Resuming journal {self.filename} ({total} entries)")
 
-        with open(self.filename, "r", encoding="utf-8") as f:
-            encrypted = f.read()
+    def _start_journal(self) -> None:
+        """Truncate the journal; the next record starts it from entry 0."""
+        self.close()
+        self._fd = os.open(
+            self.filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | _O_BINARY, 0o600
+        )
+        os.write(self._fd, JOURNAL_PREFIX + _pack_header(0, None, 0.0))
+        self._written = 0
+        self._written_hash = None
+        self._records = 0
+        self._compact_due = False
+        self._file_records = 0
+        self._size = len(JOURNAL_PREFIX) + _HEADER.size
+
+    def compact(self, cipher: Optional[JournalCipher] = None) -> None:
+        """
+        Rewrite the journal as a single snapshot of the runtime logs.
+        The snapshot is written to a temporary file and swapped in, so a
+        crash during compaction leaves the previous journal intact.
+        """
+        cipher = cipher or self._cipher
+        logs = runtime._runtime_logs_raw
+        if cipher is None or not logs:
+            return
 
+        self.close()
+        # Encoded straight from an O(1) snapshot, without a list copy
+        entries = logs.snapshot()
+        header = _pack_header(len(entries), entries.entry_hash(-1), entries.timestamp(-1))
+        temp = self.filename + ".tmp"
+        fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | _O_BINARY, 0o600)
         try:
-            logs = decrypt_metadata(
-                encrypted_metadata=encrypted,
-                key=scene.teacher_key,
-                salt_bytes=self.salt_bytes,
-                mode=mode,
+            os.write(
+                fd,
+                JOURNAL_PREFIX + header + _pack_record(cipher, RECORD_SNAPSHOT, 0, entries),
             )
-            current_len = len(getattr(runtime, "_runtime_logs_raw", []))
-            recovered_len = len(logs)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(temp, self.filename)
+
+        self._written = len(entries)
+        self._written_hash = entries.entry_hash(-1)
+        self._records = 0
+        self._compact_due = False
+        self._file_records = 1
+        self._size = os.path.getsize(self.filename)
+        self._last_compaction = time.time()
+        self._last_write = time.monotonic()
+        print(f"[Recovery] Journal compacted to {self.filename} ({len(entries)} entries)")
+
+        rotate_recovery_files(keep=self.filename)
+
+    def _write(self, record: bytes, header: bytes) -> None:
+        """Append a record, then rewrite the header in place."""
+        if self._fd is None:
+            # Not O_APPEND: the header is rewritten at a fixed offset
+            self._fd = os.open(self.filename, os.O_WRONLY | os.O_CREAT | _O_BINARY, 0o600)
+        end = os.lseek(self._fd, 0, os.SEEK_END)
+        os.write(self._fd, record)
+        os.lseek(self._fd, len(JOURNAL_PREFIX), os.SEEK_SET)
+        os.write(self._fd, header)
+        os.lseek(self._fd, end + len(record), os.SEEK_SET)
+        self._unsynced += 1
+        self._file_records += 1
+        self._size = end + len(record)
+        self._last_write = time.monotonic()
+
+        if (
+            self._unsynced >= runtime.RECOVERY_FSYNC_EVERY
+            or time.monotonic() - self._last_sync >= runtime.RECOVERY_FSYNC_INTERVAL
+        ):
+            self.sync()
+
+    def sync(self) -> None:
+        """fsync journal records written since the last sync."""
+        if self._fd is not None and self._unsynced:
+            os.fsync(self._fd)
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        if self._fd is not None:
+            self.sync()
+            os.close(self._fd)
+            self._fd = None
+
+    def on_idle(self) -> None:
+        """
+        Called periodically, and the only place the journal is compacted.
+        Once no record has been written for RECOVERY_IDLE_SECONDS, fsync
+        pending records and compact a journal holding at least
+        RECOVERY_IDLE_COMPACT_RECORDS records or flagged by save().
+        """
+        if time.monotonic() - self._last_write < runtime.RECOVERY_IDLE_SECONDS:
+            return
+        self.sync()
+
+        if not self._compact_due and self._records < runtime.RECOVERY_IDLE_COMPACT_RECORDS:
+            return
+        # Only compact while the runtime log still continues this journal
+        logs = runtime._runtime_logs_raw
+        if (
+            self._written
+            and self._written <= len(logs)
+            and logs.entry_hash(self._written - 1) == self._written_hash
+        ):
+            self.compact()
+
+    def stats(self) -> RecoveryStats:
+        size = self._size
+        if not size and os.path.exists(self.filename):
+            size = os.path.getsize(self.filename)
 
-            if recovered_len <= current_len:
-                print(
-                    f"[Recovery] Recovery skipped (current logs have {current_len} entries, recovery has {recovered_len})"
-                )
+        files = glob.glob(os.path.join(os.path.dirname(self.filename), "*" + RECOVERY_EXTENSION))
+        return {
+            "path": self.filename,
+            "size": size,
+            "records": self._file_records,
+            "entries": self._written,
+            "last_compaction": self._last_compaction,
+            "files": len(files),
+            "total_size": sum(os.path.getsize(path) for path in files if os.path.exists(path)),
+        }
+
+    # --------------------------------------------------
+    # RESTORING
+    # --------------------------------------------------
+
+    def restore(
+        self, scene: bpy.types.Scene, mode: str = "AES"
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Restore runtime log entries missing from the scene's log from the
+        recovery journal.
+
+        The journal header (entry count, last hash) is compared with the
+        runtime log first; only the missing tail is decrypted and appended.
+        A journal that no longer continues the runtime log is refused.
+        Returns the restored entries if successful, else None.
+        """
+        path = self.filename
+        if not os.path.exists(path):
+            path = Recovery.legacy_filename()
+            if not path or not os.path.exists(path):
+                print("[Recovery] No recovery file found")
+                return None
+            print(f"[Recovery] Using recovery file from an older version: {path}")
+
+        self.close()
+        cipher = self._get_cipher(scene, mode)
+        logs = runtime._runtime_logs_raw
+
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    print("[Recovery] Recovery file is empty")
+                    return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    if data[: len(JOURNAL_MAGIC)] == JOURNAL_MAGIC:
+                        tail = self._read_missing_tail(data, cipher, logs)
+                    else:
+                        tail = self._read_legacy_tail(data, scene, mode, logs)
+
+            if not tail:
+                return None
+
+            if logs and tail[0].get("ph") != logs.entry_hash(-1):
+                print("[Recovery] Recovery refused (journal diverges from the scene log)")
                 return None
 
-            runtime._runtime_logs_raw = logs
-            print(f"[Recovery] Restored {recovered_len} log entries from recovery file")
+            logs.extend(tail)
+            runtime.mark_log_dirty()
+            print(
+                f"[Recovery] Restored {len(tail)} log entries from recovery file ({len(logs)} total)"
+            )
 
             # Delete recovery after successful restoration
             self.delete()
+            if path != self.filename:
+                os.remove(path)
 
-            return logs
+            return tail
 
         except Exception as e:
             print(f"[Recovery] Failed to restore logs: {e}")
             return None
 
+    def _read_missing_tail(self, data, cipher: JournalCipher, logs) -> List[Dict[str, Any]]:
+        header = read_journal_header(data)
+        current = len(logs)
+        print(
+            f"[Recovery] Journal holds {header['count']} entries (scene log has {current})"
+        )
+
+        if header["count"] <= current:
+            if header["count"] and logs.entry_hash(header["count"] - 1) != header["last_hash"]:
+                print("[Recovery] Recovery refused (journal diverges from the scene log)")
+            else:
+                print("[Recovery] Recovery skipped (scene log is up to date)")
+            return []
+
+        tail, decrypted = read_journal_tail(data, cipher, current)
+        print(f"[Recovery] Decrypted {decrypted} journal records")
+        return tail
+
+    def _read_legacy_tail(self, data, scene, mode: str, logs) -> List[Dict[str, Any]]:
+        # Recovery file written before the journal format
+        recovered = decrypt_metadata(
+            encrypted_metadata=data[:].decode("utf-8"),
+            key=scene.teacher_key,
+            salt_bytes=self.salt_bytes,
+            mode=mode,
+        )
+        if len(recovered) <= len(logs):
+            print(
+                f"[Recovery] Recovery skipped (current logs have {len(logs)} entries, recovery has {len(recovered)})"
+            )
+            return []
+        return recovered[len(logs) :]
+
     def delete(self) -> None:
         """
         Delete the recovery file.
         """
+        self.close()
+        self._written = 0
+        self._written_hash = None
+        self._records = 0
+        self._compact_due = False
+        self._file_records = 0
+        self._size = 0
         if os.path.exists(self.filename):
             os.remove(self.filename)
             print(f"[Recovery] Recovery file {self.filename} deleted")
+
+
+# --------------------------------------------------
+# SHARED INSTANCE
+# --------------------------------------------------
+
+_active_recovery: Optional[Recovery] = None
+
+
+def get_recovery(scene: Optional[bpy.types.Scene] = None) -> Optional[Recovery]:
+    """
+    The long-lived Recovery for the scene's project, or None while the
+    scene has no project id (see start_project_session()). A new one is
+    started (and the old journal closed) when the project changes.
+    """
+    global _active_recovery
+
+    filename = Recovery.default_filename(scene)
+    if filename is None:
+        return None
+    if _active_recovery is None or _active_recovery.filename != filename:
+        if _active_recovery is not None:
+            _active_recovery.close()
+        _active_recovery = Recovery(filename)
+        rotate_recovery_files(keep=filename)
+    return _active_recovery
+
+
+def close_recovery() -> None:
+    """fsync and close the shared recovery journal."""
+    global _active_recovery
+
+    if _active_recovery is not None:
+        _active_recovery.close()
+        _active_recovery = None
+
+
+def get_recovery_stats(scene: Optional[bpy.types.Scene] = None) -> Optional[RecoveryStats]:
+    """Size, records and last compaction of the project's recovery journal."""
+    recovery = get_recovery(scene)
+    return recovery.stats() if recovery is not None else None
+
+
+# --------------------------------------------------
+# IDLE COMPACTION
+# --------------------------------------------------
+
+
+def recovery_idle_tick() -> float:
+    """Timer callback; see Recovery.on_idle()."""
+    try:
+        if _active_recovery is not None:
+            _active_recovery.on_idle()
+    except Exception as e:
+        print(f"[Recovery] Idle compaction failed: {e}")
+    return runtime.RECOVERY_IDLE_CHECK_INTERVAL
+
+
+def register_recovery_timer() -> None:
+    if not bpy.app.timers.is_registered(recovery_idle_tick):
+        bpy.app.timers.register(
+            recovery_idle_tick,
+            first_interval=runtime.RECOVERY_IDLE_CHECK_INTERVAL,
+            persistent=True,
+        )
+
+
+def unregister_recovery_timer() -> None:
+    if bpy.app.timers.is_registered(recovery_idle_tick):
+        bpy.app.timers.unregister(recovery_idle_tick)
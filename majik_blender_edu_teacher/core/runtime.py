@@ -7,25 +7,12 @@ Nothing in this file is saved to the .blend.
 # RUNTIME CACHE (NOT SAVED)
 # --------------------------------------------------
 
-from typing import Optional, TypedDict, Dict, Any, List
+from typing import Optional, Dict, Any, List
 
-
-class SceneStats(TypedDict):
-    v: int  # Vertex Count
-    f: int  # Face Count
-    o: int  # Object Count
-
-
-class ActionLogEntry(TypedDict):
-    t: float  # timestamp
-    lu: Optional[float]
-    a: str  # action_type
-    o: str  # object_name
-    ot: str  # object_type
-    d: Dict[str, Any]  # action_details
-    dt: float  # duration
-    s: SceneStats  # scene_stats
-    ph: str  # previous hash or genesis hash
+from .crypto import clear_derived_key_cache
+from .merkle import Checkpoint
+from .log_types import ActionLogEntry
+from .log_store import LogStore
 
 _known_materials: Dict[str, Dict[str, Any]] = {}
 _known_objects: set = set()
@@ -40,6 +27,30 @@ _edit_debounce: dict = {}
 _last_autosave_time: float = 0.0
 AUTOSAVE_INTERVAL: float = 5.0  # seconds
 
+LOG_COMPRESSION_LEVEL: int = 6  # zlib level (0-9) for session log segments
+LOG_USE_DICTIONARY: bool = True  # prime zlib with the preset log dictionary
+LOG_BINARY_ENCODING: bool = True  # compact binary segment payloads instead of JSON
+LOG_CHECKPOINT_INTERVAL: int = 256  # entries per Merkle checkpoint (at most)
+LOG_BACKGROUND_WRITES: bool = True  # encode log segments on a worker thread
+LOG_WRITE_POLL_INTERVAL: float = 0.05  # seconds between checks for a finished write
+LOG_SAVE_COALESCE_WINDOW: float = 1.0  # seconds a save request waits for further requests
+LOG_SAVE_MAX_DELAY: float = 5.0  # seconds; a steady stream of requests still saves this often
+LOG_MEMORY_TAIL_ENTRIES: int = 100_000  # entries kept in memory; older saved ones are re-read from the Text (0 = keep all)
+LOG_SPILL_BATCH: int = 8192  # entries spilled at once, so the columns are not trimmed on every save
+
+RECOVERY_FSYNC_EVERY: int = 16  # journal records written between fsyncs (1 = every record)
+RECOVERY_FSYNC_INTERVAL: float = 2.0  # seconds; a write after this long is always fsynced
+RECOVERY_COMPACT_EVERY: int = 512  # journal records before the idle timer compacts into a snapshot
+RECOVERY_MAX_FILE_BYTES: int = 64 * 1024 * 1024  # compact a journal at the next idle once it grows past this
+RECOVERY_MAX_FILES: int = 16  # journals kept across projects (least recently written go first)
+RECOVERY_MAX_TOTAL_BYTES: int = 256 * 1024 * 1024  # combined size cap for all journals
+RECOVERY_IDLE_SECONDS: float = 10.0  # no journal writes for this long counts as idle
+RECOVERY_IDLE_COMPACT_RECORDS: int = 32  # compact when idle and at least this many records
+RECOVERY_IDLE_CHECK_INTERVAL: float = 5.0  # seconds between idle checks
+RECOVERY_PENDING_LIMIT: int = 64  # unsaved session ids kept in the pending index
+
+
+EDIT_STATS_INTERVAL: float = 0.25  # seconds an edit-mode stats reading is reused
 
 _last_stats_time: int = 0
 _last_scene_stats = {"v": 0, "f": 0, "o": 0}
@@ -54,14 +65,38 @@ _runtime_logs: List[str] = []
 """Contains the encrypted recorded action logs for the current session."""
 
 # Decrypted runtime logs (runtime-only, never saved)
-_runtime_logs_raw: List[ActionLogEntry] = []
-"""Contains decrypted logs for runtime access. Not saved to .blend."""
+_runtime_logs_raw: LogStore = LogStore()
+"""Contains decrypted logs for runtime access (columnar, list-like). Not saved to .blend."""
 
 _pending_log: ActionLogEntry | None = None
 
 _log_dirty: bool = False
 """Indicates whether the raw runtime logs has been modified."""
 
+_log_persisted_count: int = 0
+"""Number of leading runtime log entries already stored as Text segments."""
+
+_log_persisted_segments: int = 0
+"""Number of segments currently stored in the session log Text."""
+
+_log_persisted_tail: ActionLogEntry | None = None
+"""Last persisted entry, used to detect a diverged runtime log."""
+
+_log_checkpoints: List[Checkpoint] = []
+"""Merkle checkpoints over the runtime logs, in order."""
+
+_log_persisted_checkpoint: Checkpoint | None = None
+"""Last checkpoint stored in the session log Text."""
+
+_log_verified_count: int = 0
+"""Number of leading runtime log entries whose hash chain has been verified."""
+
+_log_verified_hash: str | None = None
+"""Entry hash of the last verified entry, used to detect a replaced log."""
+
+_log_verified_genesis: str | None = None
+"""Genesis key the verified prefix was checked against."""
+
 
 _is_tampered: bool = False
 """Indicates whether the submission has been tampered with."""
@@ -107,6 +142,21 @@ def is_log_dirty() -> bool:
     return _log_dirty
 
 
+def mark_log_verified(count: int, last_hash: str, genesis: str):
+    global _log_verified_count, _log_verified_hash, _log_verified_genesis
+    _log_verified_count = count
+    _log_verified_hash = last_hash
+    _log_verified_genesis = genesis
+
+
+def reset_log_verification():
+    """Forget the verified prefix; the next validation starts from genesis."""
+    global _log_verified_count, _log_verified_hash, _log_verified_genesis
+    _log_verified_count = 0
+    _log_verified_hash = None
+    _log_verified_genesis = None
+
+
 def mark_tampered():
     global _is_tampered
     _is_tampered = True
@@ -119,7 +169,7 @@ def is_tampered() -> bool:
 
 def clear_runtime():
     """Reset all runtime-only data."""
-    global _timer_start, _timer_elapsed, _double_hash_key, _last_object_state, _transform_debounce, _log_dirty, _last_autosave_time, _runtime_metadata, _runtime_logs, _runtime_logs_raw, _is_tampered, _known_objects,_known_materials, _last_modifiers, _edit_debounce, _session_active, _last_stats_time, _last_scene_stats, _pending_log
+    global _timer_start, _timer_elapsed, _double_hash_key, _last_object_state, _transform_debounce, _log_dirty, _last_autosave_time, _runtime_metadata, _runtime_logs, _runtime_logs_raw, _is_tampered, _known_objects,_known_materials, _last_modifiers, _edit_debounce, _session_active, _last_stats_time, _last_scene_stats, _pending_log, _log_persisted_count, _log_persisted_segments, _log_persisted_tail, _log_verified_count, _log_verified_hash, _log_verified_genesis, _log_persisted_checkpoint
 
     _timer_start = None
     _timer_elapsed = 0.0
@@ -140,3 +190,12 @@ def clear_runtime():
     _last_stats_time = 0
     _last_scene_stats = {"v": 0, "f": 0, "o": 0}
     _pending_log = None
+    _log_persisted_count = 0
+    _log_persisted_segments = 0
+    _log_persisted_tail = None
+    _log_checkpoints.clear()
+    _log_persisted_checkpoint = None
+    _log_verified_count = 0
+    _log_verified_hash = None
+    _log_verified_genesis = None
+    clear_derived_key_cache()
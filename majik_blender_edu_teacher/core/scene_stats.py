@@ -1,108 +1,279 @@
-import re
 import time
 import bpy  # type: ignore
-from typing import Dict, TypedDict
+from typing import Dict, Optional, Tuple
 
-
-class SceneStats(TypedDict):
-    v: int  # Vertex Count
-    f: int  # Face Count
-    o: int  # Object Count
+from ..core import runtime
+from .log_types import SceneStats
 
 
 class SceneStatsManager:
+    """
+    Scene statistics read from object data rather than from the UI string
+    of scene.statistics(), which is localized, comma-formatted and had to
+    be regex-parsed. Counts come from the evaluated meshes (via the stats
+    engine below) and the interaction mode from context.mode, so mesh edit
+    mode reports the same evaluated counts as object mode.
+
+    The add-on reads stats through the shared instance (get_stats_manager()).
+    """
+
     def __init__(self, scene=None):
         self._last_scene_stats: SceneStats = {"v": 0, "f": 0, "o": 0}
-        self._last_stats_time: float = 0.0
-        if scene:
-            self._initialize_total_stats(scene)
+        if scene is not None:
+            self._last_scene_stats = get_stats_engine().stats(scene)
 
     @staticmethod
-    def is_edit_mode(stats_str: str) -> bool:
+    def is_edit_mode(mode: str) -> bool:
         """
-        Returns True if the scene stats indicate a single object in edit mode.
-        In edit mode, only one item appears before 'Verts'.
+        Returns True for any edit mode (EDIT_MESH, EDIT_CURVE, EDIT_ARMATURE, ...).
+        Edits there are not written to the object data until the mode is left.
         """
-        # Split by '|', trim spaces
-        parts = [p.strip() for p in stats_str.split("|")]
-        # Edit mode has only one item before the Verts/Faces info
-        return len(parts) == 2  # Example: 'Cube | Verts:12/12'
+        return mode.startswith("EDIT")
 
     @staticmethod
-    def is_armature_edit_mode(stats_str: str) -> bool:
+    def is_armature_edit_mode(mode: str) -> bool:
         """
-        Returns True if the scene stats indicate armature edit mode.
-        Detects if 'Bones' keyword is present.
+        Returns True if the context is in armature edit mode.
         """
-        return "Bones" in stats_str
+        return mode == "EDIT_ARMATURE"
 
     @staticmethod
-    def extract_denominator(stats_str: str, pattern: str) -> int:
+    def is_mesh_edit_mode(mode: str) -> bool:
         """
-        Extracts denominator if format is 'num/den', else returns the number itself.
+        Returns True if the context is in mesh edit mode, where live counts
+        are read at a throttled rate.
         """
-        match = re.search(pattern, stats_str)
-        if not match:
-            return 0
-        val = match.group(1).replace(",", "")
-        if "/" in val:
-            return int(val.split("/")[1])
-        return int(val)
-
-    def get_scene_stats(self, scene) -> SceneStats:
+        return mode == "EDIT_MESH"
+
+    def get_scene_stats(self, scene, mode: Optional[str] = None) -> SceneStats:
         """
         Returns a dictionary of scene stats: {'v': verts, 'f': faces, 'o': objects}.
-        Uses cached stats if in edit mode or armature edit mode.
+        Uses the last stats while in a non-mesh edit mode.
         """
-        now = time.time()
-        # Use cached stats if last update was less than 1 second ago
-        if now - self._last_stats_time < 1.0:
-            return self._last_scene_stats
+        if mode is None:
+            mode = bpy.context.mode
 
-        stats_str = scene.statistics(bpy.context.view_layer)
+        if self.is_mesh_edit_mode(mode):
+            self._last_scene_stats = get_stats_engine().edit_stats(scene)
+            return self._last_scene_stats
 
-        # Check if we are in edit or armature edit mode
-        if self.is_edit_mode(stats_str) or self.is_armature_edit_mode(stats_str):
+        if self.is_edit_mode(mode):
             # Always return last stats in edit/armature mode
             return self._last_scene_stats
 
-        # Otherwise, update stats
-        verts = self.extract_denominator(stats_str, r"Verts:([\d/,]+)")
-        faces = self.extract_denominator(stats_str, r"Faces:([\d/,]+)")
-        objects = self.extract_denominator(stats_str, r"Objects:([\d/,]+)")
+        self._last_scene_stats = get_stats_engine().stats(scene)
+        return self._last_scene_stats
 
-        self._last_scene_stats = {"v": verts, "f": faces, "o": objects}
-        self._last_stats_time = now
 
-        return self._last_scene_stats
+# --------------------------------------------------
+# INCREMENTAL ENGINE
+# --------------------------------------------------
+
+
+class SceneStatsEngine:
+    """
+    Long-lived scene totals, updated per object.
+
+    Every object in the scene counts towards "o"; vertex and face counts
+    come from mesh objects only (other types count as 0/0), matching the
+    Objects total of scene.statistics(). They are cached by the object's
+    session_uid and read from the mesh the depsgraph has already
+    evaluated, so no temporary mesh is created, and objects without
+    modifiers are counted once per shared mesh datablock.
+
+    on_depsgraph_update() only marks the objects in depsgraph.updates as
+    changed; stats() re-counts those and adjusts the running totals, so
+    reading the stats when nothing changed is O(1) and an update is
+    O(changed objects).
+
+    Objects are looked up by name when re-counted (references to bpy
+    objects do not survive undo). The set of objects is reconciled, in
+    O(objects), only after a Scene or Collection update (objects linked or
+    unlinked) or an invalidation. len(scene.objects) is never taken on the
+    read path: RNA computes it by iterating the objects.
+
+    In mesh edit mode every edit re-tags the edited object, so edit_stats()
+    caches its result per edit session (keyed on the active edit mesh) and
+    refreshes it at most every EDIT_STATS_INTERVAL seconds. Edited objects
+    are counted from their evaluated mesh, the same metric (modifiers
+    applied) as in object mode.
+    """
+
+    def __init__(self):
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Drop the cache; the next stats() call counts every object again."""
+        self._scene: str = ""
+        self._counts: Dict[int, Tuple[int, int]] = {}  # session_uid -> (verts, faces)
+        self._mesh_counts: Dict[int, Tuple[int, int]] = {}  # shared mesh session_uid -> (verts, faces)
+        self._names: Dict[int, str] = {}  # session_uid -> object name
+        self._dirty: Dict[int, str] = {}  # changed objects, session_uid -> name
+        self._reconcile = True
+        self._totals: SceneStats = {"v": 0, "f": 0, "o": 0}
+        self._edit_key = 0  # session_uid of the active edit mesh
+        self._edit_stats: Optional[SceneStats] = None
+        self._edit_time = 0.0
+
+    # --------------------------------------------------
+    # UPDATES
+    # --------------------------------------------------
+
+    def on_depsgraph_update(self, scene, depsgraph) -> None:
+        """Mark the objects changed in this depsgraph update."""
+        if scene.name != self._scene:
+            return
+
+        for update in depsgraph.updates:
+            id_data = update.id
+            if isinstance(id_data, bpy.types.Object):
+                original = id_data.original
+                # Any object type: it may also have become (or stopped being) a mesh
+                if update.is_updated_geometry:
+                    self._dirty[original.session_uid] = original.name
+            elif isinstance(id_data, bpy.types.Mesh):
+                if update.is_updated_geometry:
+                    self._mesh_counts.pop(id_data.original.session_uid, None)
+            elif isinstance(id_data, (bpy.types.Scene, bpy.types.Collection)):
+                # Objects may have been linked or unlinked
+                self._reconcile = True
+
+    def _count(self, obj, depsgraph) -> Tuple[int, int]:
+        if obj.type != "MESH":
+            return (0, 0)
+
+        # Without modifiers the evaluated mesh is the (shared) mesh datablock
+        mesh_uid = obj.data.session_uid if not obj.modifiers else None
+        if mesh_uid is not None:
+            counts = self._mesh_counts.get(mesh_uid)
+            if counts is not None:
+                return counts
 
-    def _initialize_total_stats(self, scene):
+        eval_mesh = obj.evaluated_get(depsgraph).data
+        if eval_mesh is None:
+            return (0, 0)
+        counts = (len(eval_mesh.vertices), len(eval_mesh.polygons))
+
+        if mesh_uid is not None:
+            self._mesh_counts[mesh_uid] = counts
+        return counts
+
+    def _set(self, uid: int, name: str, counts: Optional[Tuple[int, int]]) -> None:
+        old = self._counts.pop(uid, None)
+        self._names.pop(uid, None)
+        totals = self._totals
+        if old is not None:
+            totals["v"] -= old[0]
+            totals["f"] -= old[1]
+            totals["o"] -= 1
+        if counts is not None:
+            self._counts[uid] = counts
+            self._names[uid] = name
+            totals["v"] += counts[0]
+            totals["f"] += counts[1]
+            totals["o"] += 1
+
+    def _reconcile_objects(self, scene) -> None:
+        """Count objects new to the scene and drop the ones that left it."""
+        present: Dict[int, str] = {obj.session_uid: obj.name for obj in scene.objects}
+        for uid in [uid for uid in self._counts if uid not in present]:
+            self._set(uid, "", None)
+        for uid, name in present.items():
+            if uid not in self._counts or self._names[uid] != name:
+                self._dirty[uid] = name
+        self._reconcile = False
+
+    # --------------------------------------------------
+    # READ
+    # --------------------------------------------------
+
+    def stats(self, scene) -> SceneStats:
+        """Current scene totals, re-counting only the changed objects."""
+        self._edit_stats = None  # edit mode was left (or never entered)
+        self._refresh(scene)
+        return dict(self._totals)
+
+    def edit_stats(self, scene) -> SceneStats:
         """
-        Computes total vertices, faces, and objects including evaluated meshes.
+        Scene totals in mesh edit mode. Edited meshes are re-counted from
+        their evaluated mesh like any other object (the depsgraph keeps it
+        current while editing), at most every EDIT_STATS_INTERVAL seconds.
         """
         now = time.time()
-        depsgraph = bpy.context.evaluated_depsgraph_get()
+        active = bpy.context.view_layer.objects.active
+        key = active.data.session_uid if active is not None and active.type == "MESH" else 0
+        if (
+            self._edit_stats is not None
+            and key == self._edit_key
+            and scene.name == self._scene
+            and now - self._edit_time < runtime.EDIT_STATS_INTERVAL
+        ):
+            return dict(self._edit_stats)
+
+        self._refresh(scene)
+
+        self._edit_key = key
+        self._edit_stats = dict(self._totals)
+        self._edit_time = now
+        return dict(self._edit_stats)
 
-        total_verts = 0
-        total_faces = 0
-        total_objects = 0
+    def _refresh(self, scene) -> None:
+        if scene.name != self._scene:
+            self.invalidate()
+            self._scene = scene.name
 
-        for obj in scene.objects:
-            if obj.type != "MESH":
+        # A second pass picks up objects renamed since they were marked
+        for _ in range(2):
+            if self._reconcile:
+                self._reconcile_objects(scene)
+            if not self._dirty:
+                break
+            self._recount(scene)
+
+    def _recount(self, scene) -> None:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        dirty, self._dirty = self._dirty, {}
+        for uid, name in dirty.items():
+            obj = scene.objects.get(name)
+            if obj is None or obj.session_uid != uid:
+                # Renamed or removed since it was marked
+                self._set(uid, name, None)
+                self._reconcile = True
                 continue
+            self._set(uid, name, self._count(obj, depsgraph))
+
+
+_stats_engine: Optional[SceneStatsEngine] = None
+
+
+def get_stats_engine() -> SceneStatsEngine:
+    global _stats_engine
+
+    if _stats_engine is None:
+        _stats_engine = SceneStatsEngine()
+    return _stats_engine
+
+
+def reset_stats_engine() -> None:
+    """Forget all cached counts (undo/redo); the last stats are kept."""
+    if _stats_engine is not None:
+        _stats_engine.invalidate()
+
+
+_stats_manager: Optional[SceneStatsManager] = None
+
+
+def get_stats_manager() -> SceneStatsManager:
+    global _stats_manager
 
-            eval_obj = obj.evaluated_get(depsgraph)
-            eval_mesh = eval_obj.to_mesh(
-                preserve_all_data_layers=False, depsgraph=depsgraph
-            )
+    if _stats_manager is None:
+        _stats_manager = SceneStatsManager()
+    return _stats_manager
 
-            if eval_mesh:
-                total_verts += len(eval_mesh.vertices)
-                total_faces += len(eval_mesh.polygons)
-                total_objects += 1
-                eval_obj.to_mesh_clear()
 
-        stats = {"v": total_verts, "f": total_faces, "o": total_objects}
+def reset_scene_stats() -> None:
+    """Forget the cached counts and the last stats (file load)."""
+    global _stats_manager
 
-        self._last_scene_stats = stats
-        self._last_stats_time = now
+    reset_stats_engine()
+    _stats_manager = None
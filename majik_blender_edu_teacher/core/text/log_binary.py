@@ -0,0 +1,237 @@
+"""
+Compact binary encoding for lists of ActionLogEntry.
+
+Layout (little-endian, varint = unsigned LEB128):
+
+    b"MJB1"
+    varint  string count, then per string: varint length + UTF-8 bytes
+    varint  entry count, then per entry:
+        u8      flags (FLAG_RAW, FLAG_DETAILS)
+        FLAG_RAW set:   varint length + compact JSON of the whole entry
+        otherwise:
+            f64 t, f64 dt
+            varint a, o, ot  (indexes into the string table)
+            i64 v, f, o      (scene stats)
+            32 bytes ph
+            FLAG_DETAILS set: varint length + compact JSON of d
+
+Entries that do not have exactly the ActionLogEntry shape (key order,
+value types, a 64-char hex ph) are stored as raw JSON, so decoding always
+reproduces the original dicts and compute_entry_hash is unaffected.
+"""
+
+import json
+import struct
+from typing import Any, Dict, List, Tuple
+
+from ..log_types import ActionLogEntry
+
+
+BINARY_MAGIC = b"MJB1"
+
+FLAG_RAW = 0x01
+FLAG_DETAILS = 0x02
+
+ENTRY_KEYS = ("t", "a", "o", "ot", "d", "dt", "s", "ph")
+STATS_KEYS = ("v", "f", "o")
+
+_FLOATS = struct.Struct("<dd")
+_STATS = struct.Struct("<qqq")
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+
+# --------------------------------------------------
+# VARINT
+# --------------------------------------------------
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _write_blob(out: bytearray, blob: bytes) -> None:
+    _write_varint(out, len(blob))
+    out += blob
+
+
+def _read_blob(data: bytes, pos: int) -> Tuple[bytes, int]:
+    length, pos = _read_varint(data, pos)
+    end = pos + length
+    if end > len(data):
+        raise ValueError("Truncated binary log payload")
+    return data[pos:end], end
+
+
+def _compact_json(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+# --------------------------------------------------
+# SHAPE CHECK
+# --------------------------------------------------
+
+
+def is_compact_entry(entry: Dict[str, Any]) -> bool:
+    """
+    Whether an entry has exactly the ActionLogEntry shape, so its fields
+    can be stored in fixed-width form and rebuilt without loss.
+    """
+    if tuple(entry) != ENTRY_KEYS:
+        return False
+    if type(entry["t"]) is not float or type(entry["dt"]) is not float:
+        return False
+    if not (
+        type(entry["a"]) is str
+        and type(entry["o"]) is str
+        and type(entry["ot"]) is str
+        and type(entry["d"]) is dict
+    ):
+        return False
+
+    stats = entry["s"]
+    if type(stats) is not dict or tuple(stats) != STATS_KEYS:
+        return False
+    for value in stats.values():
+        if type(value) is not int or not _INT64_MIN <= value <= _INT64_MAX:
+            return False
+
+    ph = entry["ph"]
+    if type(ph) is not str or len(ph) != 64:
+        return False
+    try:
+        return bytes.fromhex(ph).hex() == ph
+    except ValueError:
+        return False
+
+
+# --------------------------------------------------
+# ENCODE / DECODE
+# --------------------------------------------------
+
+
+def is_binary_payload(payload: bytes) -> bool:
+    return payload[: len(BINARY_MAGIC)] == BINARY_MAGIC
+
+
+def encode_entries(entries: List[ActionLogEntry]) -> bytes:
+    """
+    Encode log entries into the compact binary form.
+    """
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        index = string_ids.get(value)
+        if index is None:
+            index = string_ids[value] = len(strings)
+            strings.append(value)
+        return index
+
+    body = bytearray()
+    _write_varint(body, len(entries))
+
+    for entry in entries:
+        if not is_compact_entry(entry):
+            body.append(FLAG_RAW)
+            _write_blob(body, _compact_json(entry))
+            continue
+
+        details = entry["d"]
+        body.append(FLAG_DETAILS if details else 0)
+        body += _FLOATS.pack(entry["t"], entry["dt"])
+        _write_varint(body, intern(entry["a"]))
+        _write_varint(body, intern(entry["o"]))
+        _write_varint(body, intern(entry["ot"]))
+        stats = entry["s"]
+        body += _STATS.pack(stats["v"], stats["f"], stats["o"])
+        body += bytes.fromhex(entry["ph"])
+        if details:
+            _write_blob(body, _compact_json(details))
+
+    out = bytearray(BINARY_MAGIC)
+    _write_varint(out, len(strings))
+    for value in strings:
+        _write_blob(out, value.encode("utf-8"))
+    out += body
+    return bytes(out)
+
+
+def decode_entries(payload: bytes) -> List[ActionLogEntry]:
+    """
+    Decode a payload produced by encode_entries back into log entries.
+    Raises ValueError if the payload is not a valid binary log payload.
+    """
+    if not is_binary_payload(payload):
+        raise ValueError("Not a binary log payload")
+
+    try:
+        pos = len(BINARY_MAGIC)
+        string_count, pos = _read_varint(payload, pos)
+        strings: List[str] = []
+        for _ in range(string_count):
+            raw, pos = _read_blob(payload, pos)
+            strings.append(raw.decode("utf-8"))
+
+        entry_count, pos = _read_varint(payload, pos)
+        entries: List[ActionLogEntry] = []
+
+        for _ in range(entry_count):
+            flags = payload[pos]
+            pos += 1
+
+            if flags & FLAG_RAW:
+                raw, pos = _read_blob(payload, pos)
+                entries.append(json.loads(raw.decode("utf-8")))
+                continue
+
+            t, dt = _FLOATS.unpack_from(payload, pos)
+            pos += _FLOATS.size
+            a, pos = _read_varint(payload, pos)
+            o, pos = _read_varint(payload, pos)
+            ot, pos = _read_varint(payload, pos)
+            v, f, so = _STATS.unpack_from(payload, pos)
+            pos += _STATS.size
+            ph = payload[pos : pos + 32]
+            if len(ph) != 32:
+                raise ValueError("Truncated binary log payload")
+            pos += 32
+
+            details: Dict[str, Any] = {}
+            if flags & FLAG_DETAILS:
+                raw, pos = _read_blob(payload, pos)
+                details = json.loads(raw.decode("utf-8"))
+
+            entries.append(
+                {
+                    "t": t,
+                    "a": strings[a],
+                    "o": strings[o],
+                    "ot": strings[ot],
+                    "d": details,
+                    "dt": dt,
+                    "s": {"v": v, "f": f, "o": so},
+                    "ph": ph.hex(),
+                }
+            )
+    except (IndexError, struct.error) as e:
+        raise ValueError(f"Truncated binary log payload: {e}") from e
+
+    if pos != len(payload):
+        raise ValueError("Trailing bytes after binary log payload")
+    return entries
@@ -0,0 +1,119 @@
+"""
+Preset zlib dictionaries for session log segments.
+
+A dictionary primes the compressor with strings that recur in every log, so
+even a small incremental segment compresses well. Dictionaries are part of
+the stored format: never edit a shipped one, add a new id instead.
+"""
+
+import base64
+from typing import Dict, Iterable
+
+
+# --------------------------------------------------
+# DICTIONARY v2
+# --------------------------------------------------
+
+# Generated by benchmarks/build_log_dictionary.py with build_log_dictionary()
+# from binary payloads of 10-entry segments, the format segments are
+# written in. Regenerate under a new id; never edit it in place.
+LOG_ZDICT_V2: bytes = base64.b64decode(
+    "AAAAAAgAAAAAAAAA9rQsIiLOQ34OPTEIMWphgnP7MV47Q27hIMP9gldgOrxNSkIxECVPcGVyYXRv"
+    "cjogTUVTSF9PVF9leHRydWRlX3JlZ2lvbl9tb3ZlBVRvcnVzBE1FU0gaVHJhbnNmb3JtZWQgT2Jq"
+    "ZWN0IChTY2FsZSkIQ3ViZS4wMDEbQWRkZWQgTW9kaWZpZXI6IFN1YmRpdmlzaW9uB1N1emFubmUc"
+    "QWRkZWQgTWF0ZXJpYWw6IE1hdGVyaWFsLjAwMQhDeWxpbmRlcgtFZGl0ZWQgTWVzaAVQbGFuZR1U"
+    "cmFuc2Zvcm1lZCBPYmplY3QgKFJvdGF0aW9uKQRDdWJlCkZpbGUgU2F2ZWQKX19TWVNURU1fXwZT"
+    "WVNURU0KADeJ8aeKVdpB001iEFh5MkAAAQLEmAAAAAAAAMKYAAAAAAAAAQAAAAAAAACGCqXERjUC"
+    "Ks7gWVBST6hXguoC/8b75fCKR2VrRMLqgwCPwvWoilXaQVK4HoXr0RlAAAECy5gAAAAAAADJmAAA"
+    "AAAAAAsAAAAAAAAAbY84GnEVz4MyCS+4huiyhCs7I8Y/jRd75U7FGBrn3voAcT3arIpV2kHfT42X"
+    "brIzQAMEAuCYAAAAAAAA3pgAAAAAAAABAAAAAAAAAGkBJ7VxLpcGPNMUv2+7ADYj08IlsYtk4Hz9"
+    "mqvTSmZ/AARWJq6KVdpBj8L1KFyvMkAFBgLwmAAAAAAAAO6YAAAAAAAACwAAAAAAAACDmyOPsugb"
+    "0ZhemQ2Ag/l2fDyg4wj2UVoExrqRKjZCKwCsHIKzilXaQd9PjZdu0ihABwEC85gAAAAAAADxmAAA"
+    "AAAAAAUAAAAAAAAAlOSTwYkD0iuUprYkhzfu4NkgK/Ztpif/ISyHXPpQnNQAWDnMuopV2kFt5/up"
+    "8dItQAUIAgiZAAAAAAAABpkAAAAAAAAMAAAAAAAAABRCHILlPRC9MHuz8x71opKqW0R+O+58xjhW"
+    "B3OJhN7bAAaB3bqKVdpB6SYxCKxcMEAJCgIimQAAAAAAACCZAAAAAAAAAgAAAAAAAAACcepGBRCA"
+    "IxkbYyXt1zEiWp7FWT0RuEyuc9Ap7r/EQADy0kW/ilXaQawcWmQ73xVACwwCKJkAAAAAAAAmmQAA"
+    "AAAAAAoAAAAAAAAAG7SbCm91CrNjiqnQ7LfGINZhurhdIg6yg8x4+Znx9UoCSOEKw4pV2kHhehSu"
+    "RyExQA0ODzWZAAAAAAAAM5kAAAAAAAAMAAAAAAAAAPgZEACAZ9TJbx6PzUt9NtTf4mH1Z45eZ6PO"
+    "V8LufBGGLXsiZmlsZXBhdGgiOiJDOi9Vc2Vycy9zdHVkZW50L3Byb2plY3QuYmxlbmQifQD6fmLJ"
+    "ilXaQYcW2c730x1ACQYCRpkAAAAAAABEmQAAAAAAAAQAAAAAAAAA1QxwefxEDpGaAiAlz82t13Tv"
+    "bCH9bCO/lvOYyD5guEJNSkIxDxtBZGRlZCBNb2RpZmllcjogU3ViZGl2aXNpb24IQ3lsaW5kZXIE"
+    "TUVTSB1UcmFuc2Zvcm1lZCBPYmplY3QgKFJvdGF0aW9uKQVUb3J1cwtFZGl0ZWQgTWVzaAZTcGhl"
+    "cmUFUGxhbmUcQWRkZWQgTWF0ZXJpYWw6IE1hdGVyaWFsLjAwMQRDdWJlCkZpbGUgU2F2ZWQKX19T"
+    "WVNURU1fXwZTWVNURU0dVHJhbnNmb3JtZWQgT2JqZWN0IChMb2NhdGlvbikHU3V6YW5uZQoAeenW"
+    "y4pV2kH+1HjpJjEpQAABAkiZAAAAAAAARpkAAAAAAAADAAAAAAAAAAUBri2MUO3K8OdZ3+LslTCK"
+    "QjOyquhNgK1d0NGX4DC8AOxRINCKVdpBnMQgsHJo8T8DBAJXmQAAAAAAAFWZAAAAAAAAAgAAAAAA"
+    "AABTQmYMlZOPeBKjs6InWcujXfaf/O50P9hpmFSOcDIywwB7FI7QilXaQS/dJAaBVS9ABQYCbZkA"
+    "AAAAAABrmQAAAAAAAAwAAAAAAAAA2ICa9fu4LFY6IkBOFYkJpQ+ZVI8LXjsTIrnTiYVm56kAz/eb"
+    "14pV2kGR7Xw/NV4qQAMHAnqZAAAAAAAAeJkAAAAAAAAEAAAAAAAAAAG7wD8tGyB/UN60finVUhNs"
+    "IE3XSXvZyKU00pFHSx7YAPYozNqKVdpB/Knx0k3iHkAFBAKdmQAAAAAAAJuZAAAAAAAABgAAAAAA"
+    "AACyzHcl51YZTnWL0+aI6gCdSd/j3E72E2lITr2pALH4twBvEvvgilXaQaabxCCwMi5AAwYCo5kA"
+    "AAAAAAChmQAAAAAAAAwAAAAAAAAAf/0iqGsnmHQ/bNF4chO2h01bl7teIhbq9AjXNW17G7oA1XgR"
+    "54pV2kH6fmq8dJMQQAgJAsmZAAAAAAAAx5kAAAAAAAAMAAAAAAAAAIWFqLAuVdOZd0e/zgEX1787"
+    "mSgpbwhyhWxV0M8n9v7nAEJgXe6KVdpBarx0kxiEK0AABwLumQAAAAAAAOyZAAAAAAAABwAAAAAA"
+    "AAClKMwv3fWjczjbgvYZicjrRtlvif/pTuFZAfHOBXZwLQJaZLP1ilXaQQAAAAAAQCNACgsM8pkA"
+    "AAAAAADwmQAAAAAAAAgAAAAAAAAACPTSwODJz2R0N3iOcNHcsDnb+egVMqdoCKXsLIFXlQMteyJm"
+    "aWxlcGF0aCI6IkM6L1VzZXJzL3N0dWRlbnQvcHJvamVjdC5ibGVuZCJ9AKJFLviKVdpBTmIQWDm0"
+    "C0ANDgL9mQAAAAAAAPuZAAAAAAAABwAAAAAAAADVHrNQUcV0S38LtiVXIV7j7SZ8/K5ZBYuBtiDC"
+    "4MxQuE1KQjELHVRyYW5zZm9ybWVkIE9iamVjdCAoUm90YXRpb24pBVRvcnVzBE1FU0gbQWRkZWQg"
+    "TW9kaWZpZXI6IFN1YmRpdmlzaW9uCEN1YmUuMDAxBVBsYW5lJU9wZXJhdG9yOiBNRVNIX09UX2V4"
+    "dHJ1ZGVfcmVnaW9uX21vdmUIQ3lsaW5kZXIaVHJhbnNmb3JtZWQgT2JqZWN0IChTY2FsZSkEQ3Vi"
+    "ZQZTcGhlcmUKAClcf/yKVdpBPQrXo3A9DUAAAQIImgAAAAAAAAaaAAAAAAAACgAAAAAAAABqkyNM"
+    "ElHErr0NsjzAtJGx/ew056Ynqs2CQm2cZ+wIwgCiRY7/ilXaQc/3U+OluzFAAwQCL5oAAAAAAAAt"
+    "mgAAAAAAAAoAAAAAAAAAaRzGadFC7qHXjv/TA5t98prTzc11VO1gYiQ5N7QWEm0A4XokBYtV2kEj"
+    "2/l+arwVQAAFAk6aAAAAAAAATJoAAAAAAAADAAAAAAAAAJmacM/Zsji7vIAa/Okhifb6wrO0FoD8"
+    "ij9t/fNBkyyxAOF6zAiLVdpBGQRWDi2yKEAGBAJmmgAAAAAAAGSaAAAAAAAACAAAAAAAAACZE603"
+    "z0Go3qVDKx+B61YtOo4KBmtbUsW9N/haeve7mwArh2YLi1XaQQaBlUOLbANABgcCjZoAAAAAAACL"
+    "mgAAAAAAAAcAAAAAAAAABbStBrpeI3fOHk5xSApky8QynGeqSgfmh/WLBgEUDfIAlkNDDItV2kEA"
+    "AAAAAAAaQAgJAqqaAAAAAAAAqJoAAAAAAAAIAAAAAAAAAMPZNm9ofHlZ7V2XKZRmnlnL1A3GMbB0"
+    "WYC6HBn7e+agAEw3EQ2LVdpB5/up8dINLkAICQLKmgAAAAAAAMiaAAAAAAAACQAAAAAAAADgGEcT"
+    "xNZzPFwN78X6ukY/BaH3rMBj6R/shOOL0nY8fwC8dDMQi1XaQZhuEoPASilABgoC3poAAAAAAADc"
+    "mgAAAAAAAAQAAAAAAAAAURaPaNFCFYoWD9oYHope9gHVp4803/3BcIBDZhvXhbUAgZXDFYtV2kHl"
+    "0CLb+b4jQAAJAumaAAAAAAAA55oAAAAAAAACAAAAAAAAAKgE6X7V146VZYytuWbhti3ESLA+KL9Z"
+    "hkZKXV3oVuQzAH0/5RWLVdpBUI2XbhKD+j8ACQIOmwAAAAAAAAybAAAAAAAACgAAAAAAAAA87sjV"
+    "Ye+UxSvu8tk/9ID9JIByas2DfoTUrdlWWUGq001KQjEPHEFkZGVkIE1hdGVyaWFsOiBNYXRlcmlh"
+    "bC4wMDEHU3V6YW5uZQRNRVNICkZpbGUgU2F2ZWQKX19TWVNURU1fXwZTWVNURU0aVHJhbnNmb3Jt"
+    "ZWQgT2JqZWN0IChTY2FsZSkFUGxhbmUIQ3ViZS4wMDEdVHJhbnNmb3JtZWQgT2JqZWN0IChSb3Rh"
+    "dGlvbikGU3BoZXJlJU9wZXJhdG9yOiBNRVNIX09UX2V4dHJ1ZGVfcmVnaW9uX21vdmUdVHJhbnNm"
+    "b3JtZWQgT2JqZWN0IChMb2NhdGlvbikEQ3ViZQtFZGl0ZWQgTWVzaAoAmpmJGItV2kGLbOf7qbEx"
+    "QAABAi+bAAAAAAAALZsAAAAAAAAGAAAAAAAAALX3/kwe3r+ezG5ZM0WiERgB+krNDkVJEgmttwD7"
+    "3V3oAjm0oB6LVdpB5/up8dJNHUADBAU0mwAAAAAAADKbAAAAAAAABwAAAAAAAABjUiy932Y3a8/t"
+    "74+lgcZ/6GzTfSrPvrjFtMWhICHiyC17ImZpbGVwYXRoIjoiQzovVXNlcnMvc3R1ZGVudC9wcm9q"
+    "ZWN0LmJsZW5kIn0AokXuI4tV2kHRItv5fiomQAYHAlWbAAAAAAAAU5sAAAAAAAABAAAAAAAAAH3n"
+    "G9AokRIj05MB0vDkZ8b5Kteq56u2eeecKehAMNwyAE5iECWLVdpBXrpJDAJrIUAABwJ1mwAAAAAA"
+    "AHObAAAAAAAABgAAAAAAAADmVd7s0ZKF7f2efjyOrTMzj2zpXWkNAO98MPzHIdfPVQBCYL0mi1Xa"
+    "QfLSTWIQ2BxAAAgCe5sAAAAAAAB5mwAAAAAAAAgAAAAAAAAAWgU0LjBrPyZwvCuYUnJgsObxXK+I"
+    "naUNZRhmdBCQoTAAc2hxLItV2kEOLbKd76cwQAkKAo+bAAAAAAAAjZsAAAAAAAAEAAAAAAAAAPuo"
+    "s88sthMvmP4/YU/Uyw5KUfoObhTHAo/cwIVyCLYjAIcWGTOLVdpBJzEIrBzaMUAAAQKqmwAAAAAA"
+    "AKibAAAAAAAABwAAAAAAAAClD/DWbm6fdtgobh6VvVjN4SkdwkXvgEnv0Xhwf5r9QwDdJFY4i1Xa"
+    "QYXrUbgeBRpACwECt5sAAAAAAAC1mwAAAAAAAAkAAAAAAAAAHjnZRDe3ECTRNv8VdeE+/ysKrRRz"
+    "7E6hdwC6pcH5Il4A7nyXP4tV2kHb+X5qvHQZQAwNAt+bAAAAAAAA3ZsAAAAAAAAHAAAAAAAAAFpO"
+    "mfdVgjDgkt3bFH9dK3VtnUMmawkS79fqGdyqcGjFADm0QEOLVdpBLbKd76fG0z8ODQIAnAAAAAAA"
+    "AP6bAAAAAAAACAAAAAAAAADcX0JOLfAeml4HnAgri7uqmfb/eUVomNwMkCBKZUXOzA=="
+)
+
+LOG_DICTIONARIES: Dict[str, bytes] = {
+    "d2": LOG_ZDICT_V2,
+}
+
+
+# --------------------------------------------------
+# BUILDER
+# --------------------------------------------------
+
+
+def build_log_dictionary(sample_payloads: Iterable[bytes], max_size: int = 4096) -> bytes:
+    """
+    Build a zlib dictionary from sample segment payloads.
+
+    The payloads must be serialized the way segments are written (the
+    compact binary form, see log_binary.py), so the dictionary holds the
+    magic, string tables and entry layout zlib will actually see. They are
+    laid end to end and the last max_size bytes are kept: zlib reaches the
+    end of the dictionary with the shortest distances.
+
+    :param sample_payloads: Serialized payloads of representative segments
+    :param max_size: Maximum dictionary size in bytes (zlib uses at most 32 KiB)
+    :return: The dictionary bytes
+    """
+    return b"".join(sample_payloads)[-max_size:]
@@ -0,0 +1,330 @@
+"""
+Session log segment codec.
+
+Each segment is one line of the session log Text datablock. Nothing in this
+module touches bpy, so segments can be encoded and decoded off the main thread.
+"""
+
+import os
+import hmac
+import json
+import zlib
+import base64
+import hashlib
+from typing import List, Optional, Tuple, TypedDict
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from .log_dictionary import LOG_DICTIONARIES
+from .log_binary import encode_entries, decode_entries, is_binary_payload
+from ..crypto import derive_subkey
+from ..merkle import Checkpoint
+from ..log_types import ActionLogEntry
+
+
+# -------------------------------------------------------------------
+# CONSTANTS
+# -------------------------------------------------------------------
+
+# S3:<seq>:<start>:<count>:<t0>:<t1>:<codec>:<base64(nonce + AES-GCM ciphertext)>
+# The header (everything before the payload) is authenticated as AAD.
+SEGMENT_PREFIX_V3 = "S3:"
+
+# C1:<index>:<start>:<end>:<root>:<chain>:<base64(HMAC-SHA256 of the rest)>
+# A Merkle checkpoint (see merkle.py), readable without decrypting segments.
+CHECKPOINT_PREFIX_V1 = "C1:"
+
+# Payload codecs: the plaintext is the entry list (compact binary, see
+# log_binary.py, or JSON when it does not start with the binary magic), then
+CODEC_ZLIB = "z"  # zlib compressed
+CODEC_RAW = "r"  # stored as is (tiny segments zlib cannot shrink)
+CODEC_ZLIB_DICT_V2 = "d2"  # zlib compressed with preset dictionary v2
+
+DEFAULT_COMPRESSION_LEVEL = 6
+
+SEGMENT_KEY_INFO = b"majik-session-log-segment"
+CHECKPOINT_KEY_INFO = b"majik-session-log-checkpoint"
+SEGMENT_NONCE_SIZE = 12
+
+
+class SegmentInfo(TypedDict):
+    line: int  # line index in the Text datablock
+    seq: int  # segment sequence number
+    start: int  # index of the first entry
+    count: int  # number of entries
+    t0: float  # first entry timestamp
+    t1: float  # last entry timestamp
+    codec: str  # payload codec
+
+
+class SegmentCipher:
+    """
+    Keys used to read and write segments.
+    Segments use AES-GCM with a subkey derived from the data key. Checkpoint
+    lines are authenticated with another subkey.
+    """
+
+    def __init__(self, data_key: bytes):
+        self.aead = AESGCM(derive_subkey(data_key, SEGMENT_KEY_INFO))
+        self.checkpoint_key = derive_subkey(data_key, CHECKPOINT_KEY_INFO)
+
+
+# -------------------------------------------------------------------
+# HEADER
+# -------------------------------------------------------------------
+
+
+def is_segment_line(line: str) -> bool:
+    return line.startswith(SEGMENT_PREFIX_V3)
+
+
+def parse_segment_header(line: str, line_index: int = 0) -> Tuple[SegmentInfo, str, str]:
+    """
+    Parse a segment line without decrypting it.
+
+    :return: The segment info, the raw header (AAD) and the payload
+    :raises ValueError: If the line is not a well-formed segment
+    """
+    try:
+        if not line.startswith(SEGMENT_PREFIX_V3):
+            raise ValueError("unknown segment type")
+        fields = line[len(SEGMENT_PREFIX_V3) :].split(":", 6)
+        seq, start, count, t0, t1, codec, payload = fields
+        if codec not in _DECOMPRESSORS:
+            raise ValueError(f"unknown codec {codec!r}")
+        info: SegmentInfo = {
+            "line": line_index,
+            "seq": int(seq),
+            "start": int(start),
+            "count": int(count),
+            "t0": float(t0),
+            "t1": float(t1),
+            "codec": codec,
+        }
+    except ValueError as e:
+        raise ValueError(f"Malformed log segment header in line {line_index}: {e}") from e
+
+    return info, line[: len(line) - len(payload)], payload
+
+
+def check_segment_order(info: SegmentInfo, expected_seq: int, expected_start: int) -> None:
+    """
+    :raises ValueError: If the segment is out of order or misplaced
+    """
+    seq = info["seq"]
+    if seq != expected_seq:
+        raise ValueError(f"Log segment {seq} out of order (expected {expected_seq})")
+    if info["start"] != expected_start:
+        raise ValueError(
+            f"Log segment {seq} starts at entry {info['start']} (expected {expected_start})"
+        )
+
+
+def segment_overlaps(
+    info: SegmentInfo,
+    *,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    start_index: Optional[int] = None,
+    end_index: Optional[int] = None,
+) -> bool:
+    """
+    Whether a segment may hold entries in the given time range (inclusive)
+    and entry range (half-open).
+    """
+    if not info["count"]:
+        return False
+
+    first, last = info["start"], info["start"] + info["count"] - 1
+    if start_index is not None and last < start_index:
+        return False
+    if end_index is not None and first >= end_index:
+        return False
+
+    if start_time is not None and info["t1"] < start_time:
+        return False
+    if end_time is not None and info["t0"] > end_time:
+        return False
+    return True
+
+
+# -------------------------------------------------------------------
+# ENCODE / DECODE
+# -------------------------------------------------------------------
+
+
+def _compress_with_dictionary(data: bytes, zdict: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS, zdict=zdict)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _decompress_with_dictionary(data: bytes, zdict: bytes) -> bytes:
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS, zdict=zdict)
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+_DECOMPRESSORS = {
+    CODEC_ZLIB: zlib.decompress,
+    CODEC_RAW: bytes,
+    CODEC_ZLIB_DICT_V2: lambda data: _decompress_with_dictionary(
+        data, LOG_DICTIONARIES[CODEC_ZLIB_DICT_V2]
+    ),
+}
+
+
+def compress_payload(
+    serialized: bytes,
+    *,
+    level: int = DEFAULT_COMPRESSION_LEVEL,
+    use_dictionary: bool = True,
+) -> Tuple[str, bytes]:
+    """
+    Compress a serialized payload, falling back to the raw bytes when
+    compression does not make it smaller.
+
+    :param serialized: The serialized payload
+    :param level: zlib compression level (0-9)
+    :param use_dictionary: Prime zlib with the preset log dictionary
+    :return: The codec id and the payload
+    """
+    if use_dictionary:
+        codec = CODEC_ZLIB_DICT_V2
+        compressed = _compress_with_dictionary(
+            serialized, LOG_DICTIONARIES[codec], level
+        )
+    else:
+        codec = CODEC_ZLIB
+        compressed = zlib.compress(serialized, level=level)
+
+    if len(compressed) < len(serialized):
+        return codec, compressed
+    return CODEC_RAW, serialized
+
+
+def decompress_payload(codec: str, payload: bytes) -> bytes:
+    if codec not in _DECOMPRESSORS:
+        raise ValueError(f"Unknown log segment codec {codec!r}")
+    return _DECOMPRESSORS[codec](payload)
+
+
+def serialize_entries(entries: List[ActionLogEntry], *, binary: bool = True) -> bytes:
+    if binary:
+        return encode_entries(entries)
+    return json.dumps(entries, separators=(",", ":"), ensure_ascii=False).encode(
+        "utf-8"
+    )
+
+
+def deserialize_entries(serialized: bytes) -> List[ActionLogEntry]:
+    if is_binary_payload(serialized):
+        return decode_entries(serialized)
+    return json.loads(serialized.decode("utf-8"))
+
+
+def encode_segment(
+    entries: List[ActionLogEntry],
+    seq: int,
+    start: int,
+    cipher: SegmentCipher,
+    *,
+    level: int = DEFAULT_COMPRESSION_LEVEL,
+    use_dictionary: bool = True,
+    binary: bool = True,
+) -> str:
+    """
+    Encode entries as one S3 segment line:
+    encode (binary or json.dumps) → compress → AES-GCM (header as AAD) → base64
+    The AES-GCM output is text-encoded exactly once.
+    """
+    t0 = float(entries[0].get("t", 0.0)) if entries else 0.0
+    t1 = float(entries[-1].get("t", 0.0)) if entries else 0.0
+
+    codec, payload = compress_payload(
+        serialize_entries(entries, binary=binary),
+        level=level,
+        use_dictionary=use_dictionary,
+    )
+
+    header = f"{SEGMENT_PREFIX_V3}{seq}:{start}:{len(entries)}:{t0!r}:{t1!r}:{codec}:"
+    nonce = os.urandom(SEGMENT_NONCE_SIZE)
+    sealed = cipher.aead.encrypt(nonce, payload, header.encode("ascii"))
+    return header + base64.b64encode(nonce + sealed).decode("ascii")
+
+
+def decode_segment(
+    line: str,
+    cipher: SegmentCipher,
+    *,
+    expected_seq: Optional[int] = None,
+    expected_start: Optional[int] = None,
+    line_index: int = 0,
+) -> List[ActionLogEntry]:
+    """
+    Decode one segment line, verifying its position and entry count.
+    Raises ValueError if the segment is out of order or truncated, and
+    cryptography's InvalidTag if it was tampered with.
+    """
+    info, header, payload = parse_segment_header(line, line_index)
+    if expected_seq is not None and expected_start is not None:
+        check_segment_order(info, expected_seq, expected_start)
+
+    sealed = base64.b64decode(payload)
+    nonce, sealed = sealed[:SEGMENT_NONCE_SIZE], sealed[SEGMENT_NONCE_SIZE:]
+    compressed = cipher.aead.decrypt(nonce, sealed, header.encode("ascii"))
+
+    entries = deserialize_entries(decompress_payload(info["codec"], compressed))
+
+    if len(entries) != info["count"]:
+        raise ValueError(
+            f"Log segment {info['seq']} holds {len(entries)} entries (header says {info['count']})"
+        )
+    return entries
+
+
+# -------------------------------------------------------------------
+# CHECKPOINTS
+# -------------------------------------------------------------------
+
+
+def is_checkpoint_line(line: str) -> bool:
+    return line.startswith(CHECKPOINT_PREFIX_V1)
+
+
+def _checkpoint_tag(header: str, cipher: SegmentCipher) -> bytes:
+    return hmac.new(cipher.checkpoint_key, header.encode("ascii"), hashlib.sha256).digest()
+
+
+def encode_checkpoint(checkpoint: Checkpoint, cipher: SegmentCipher) -> str:
+    """
+    Encode a checkpoint as one C1 line. The fields stay readable; the line
+    is authenticated, not encrypted.
+    """
+    header = (
+        f"{CHECKPOINT_PREFIX_V1}{checkpoint['index']}:{checkpoint['start']}:"
+        f"{checkpoint['end']}:{checkpoint['root']}:{checkpoint['chain']}:"
+    )
+    return header + base64.b64encode(_checkpoint_tag(header, cipher)).decode("ascii")
+
+
+def decode_checkpoint(line: str, cipher: SegmentCipher, line_index: int = 0) -> Checkpoint:
+    """
+    Decode one C1 line, verifying its tag.
+    Raises ValueError if the line is malformed or was tampered with.
+    """
+    try:
+        index, start, end, root, chain, tag = line[len(CHECKPOINT_PREFIX_V1) :].split(":", 5)
+        checkpoint: Checkpoint = {
+            "index": int(index),
+            "start": int(start),
+            "end": int(end),
+            "root": root,
+            "chain": chain,
+        }
+        expected = _checkpoint_tag(line[: len(line) - len(tag)], cipher)
+        valid = hmac.compare_digest(base64.b64decode(tag), expected)
+    except ValueError as e:
+        raise ValueError(f"Malformed log checkpoint in line {line_index}: {e}") from e
+
+    if not valid:
+        raise ValueError(f"Log checkpoint in line {line_index} failed authentication")
+    return checkpoint
@@ -4,15 +4,38 @@ import bpy  # type: ignore
 import json
 import zlib
 import base64
-from typing import Any, Dict, List, Optional, TypedDict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, TypedDict
 
 from .text_data import TextData
-from ...core.crypto import fernet_key_from_string
+from .log_segments import (
+    SegmentCipher,
+    SegmentInfo,
+    is_segment_line,
+    parse_segment_header,
+    check_segment_order,
+    segment_overlaps,
+    encode_segment,
+    decode_segment,
+    is_checkpoint_line,
+    encode_checkpoint,
+    decode_checkpoint,
+)
+from ...core import runtime
+from ...core.merkle import Checkpoint, find_checkpoint_chain_break
+from ...core.log_types import ActionLogEntry
+from ...core.crypto import (
+    fernet_key_from_string,
+    generate_data_key,
+    wrap_data_key,
+    unwrap_data_key,
+)
 
 from cryptography.fernet import Fernet
 from ...core.constants import (
     SCENE_STUDENT_ID_HASH,
     SCENE_TEACHER_DOUBLE_HASH,
+    SCENE_LOG_WRAPPED_KEY,
+    SCENE_LOG_FORMAT_VERSION,
 )
 
 
@@ -21,22 +44,30 @@ from ...core.constants import (
 # -------------------------------------------------------------------
 SESSION_LOG_TEXT_NAME = "__MAJIK_SESSION_LOG__"
 
-
-class SceneStats(TypedDict):
-    v: int  # Vertex Count
-    f: int  # Face Count
-    o: int  # Object Count
-
-
-class ActionLogEntry(TypedDict):
-    t: float  # timestamp
-    a: str  # action_type
-    o: str  # object_name
-    ot: str  # object_type
-    d: Dict[str, Any]  # action_details
-    dt: float  # duration
-    s: SceneStats  # scene_stats
-    ph: str  # previous hash or genesis hash
+# v1: a single blob encrypted directly with the PBKDF2-derived key
+# v3: logs encrypted with a random data key, wrapped once under the derived
+#     key, and stored as append-only S3 segments (one per line), see
+#     log_segments.py; Merkle checkpoint lines (C1) may follow the segments
+#     they cover
+LOG_FORMAT_V1 = 1
+LOG_FORMAT_V3 = 3
+
+
+# A planned save of the session log, see SessionLogController.plan_write()
+class LogWrite(TypedDict):
+    append: bool  # append lines (True) or rewrite the Text (False)
+    scene: str  # name of the scene the log belongs to
+    cipher: SegmentCipher
+    base_count: int  # persisted state the plan was made against
+    base_segments: int
+    base_checkpoint: Optional[Checkpoint]
+    start: int  # index of the first entry in entries
+    seq: int  # sequence number of the segment to write
+    entries: Sequence[ActionLogEntry]  # log snapshot; [start:count] is encoded
+    checkpoints: List[Checkpoint]  # checkpoints to write after the segment
+    count: int  # persisted state once the write is applied
+    tail: Optional[ActionLogEntry]
+    last_checkpoint: Optional[Checkpoint]
 
 
 def get_student_id_hash(scene) -> str:
@@ -58,9 +89,54 @@ class SessionLogController:
     """
     Controller for managing session logs in Blender via a Text datablock.
     Follows the architecture:
-    _runtime_logs_raw (List[ActionLogEntry]) → json.dumps → zlib.compress → encrypt → base64 → Text
+    new entries of _runtime_logs_raw → binary encode → zlib (preset dict) → AES-GCM → segment line → Text
+
+    Segments are encrypted with a random data key stored wrapped in the
+    scene, so PBKDF2 only runs once per runtime (to unwrap it).
     """
 
+    # -------------------------------------------------------------------
+    # DATA KEY (ENVELOPE ENCRYPTION)
+    # -------------------------------------------------------------------
+    @staticmethod
+    def create_data_key(scene: bpy.types.Scene) -> None:
+        """
+        Generate a new random data key and store it wrapped under the
+        PBKDF2-derived key.
+        """
+        print("[SessionLogController] create_data_key() called")
+        salt_bytes = get_student_id_hash(scene).encode("utf-8")
+        key = get_teacher_double_hash(scene)
+
+        scene[SCENE_LOG_WRAPPED_KEY] = wrap_data_key(
+            generate_data_key(), key, salt_bytes
+        )
+        print("[SessionLogController] Data key generated and wrapped")
+
+    @staticmethod
+    def get_v1_cipher(scene: bpy.types.Scene) -> Fernet:
+        """Cipher keyed directly by the PBKDF2-derived key (legacy v1 blobs)."""
+        salt_bytes = get_student_id_hash(scene).encode("utf-8")
+        key = get_teacher_double_hash(scene)
+        return Fernet(fernet_key_from_string(key, salt_bytes))
+
+    @staticmethod
+    def get_data_key(
+        scene: bpy.types.Scene, *, create: bool = False
+    ) -> Optional[bytes]:
+        """
+        Return the unwrapped log data key, or None when the scene has none
+        yet (a v1 scene). When create is True, one is generated first.
+        """
+        if SCENE_LOG_WRAPPED_KEY not in scene:
+            if not create:
+                return None
+            SessionLogController.create_data_key(scene)
+
+        salt_bytes = get_student_id_hash(scene).encode("utf-8")
+        key = get_teacher_double_hash(scene)
+        return unwrap_data_key(scene[SCENE_LOG_WRAPPED_KEY], key, salt_bytes)
+
     # -------------------------------------------------------------------
     # ENSURE SESSION TEXT EXISTS
     # -------------------------------------------------------------------
@@ -85,51 +161,314 @@ class SessionLogController:
         print("[SessionLogController] Session log text created successfully")
         return text
 
+    # -------------------------------------------------------------------
+    # SEGMENTS
+    # -------------------------------------------------------------------
+    @staticmethod
+    def get_segment_cipher(
+        scene: bpy.types.Scene, *, create: bool = False
+    ) -> SegmentCipher:
+        """
+        Return the keys used to read and write log segments.
+        When create is True, a v1 scene is upgraded to a wrapped data key.
+        Raises ValueError if the scene has no data key (and create is False).
+        """
+        data_key = SessionLogController.get_data_key(scene, create=create)
+        if data_key is None:
+            raise ValueError("Session log segments found but the scene has no data key")
+        return SegmentCipher(data_key)
+
+    @staticmethod
+    def read_segment_index() -> List[SegmentInfo]:
+        """
+        Read the segment index (offsets, entry counts and timestamps) from the
+        segment headers without decrypting anything.
+        Raises ValueError if segments are missing, out of order or misplaced.
+        """
+        text = TextData.get_text(SESSION_LOG_TEXT_NAME)
+        if not text:
+            return []
+
+        index: List[SegmentInfo] = []
+        total = 0
+        for line_index, line in enumerate(text.lines):
+            body = line.body
+            if not body.strip() or is_checkpoint_line(body):
+                continue
+            if not is_segment_line(body):
+                raise ValueError("Session log is not stored as segments")
+
+            info, _, _ = parse_segment_header(body, line_index)
+            check_segment_order(info, len(index), total)
+            index.append(info)
+            total += info["count"]
+
+        return index
+
+    @staticmethod
+    def iter_logs_in_range(
+        *,
+        scene: Optional[bpy.types.Scene] = None,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        start_index: Optional[int] = None,
+        end_index: Optional[int] = None,
+    ) -> Iterator[ActionLogEntry]:
+        """
+        Lazily yield the logs within a time range (inclusive) and/or entry
+        range (half-open). Only segments overlapping the range are decrypted.
+        """
+        if scene is None:
+            scene = bpy.context.scene
+
+        text = TextData.get_text(SESSION_LOG_TEXT_NAME)
+        index = SessionLogController.read_segment_index()
+        if not text or not index:
+            return
+
+        cipher = SessionLogController.get_segment_cipher(scene)
+        bounds = {
+            "start_time": start_time,
+            "end_time": end_time,
+            "start_index": start_index,
+            "end_index": end_index,
+        }
+
+        for info in index:
+            if not segment_overlaps(info, **bounds):
+                continue
+
+            print(f"[SessionLogController] Decrypting segment {info['seq']}")
+            entries = decode_segment(
+                text.lines[info["line"]].body, cipher, line_index=info["line"]
+            )
+            for offset, entry in enumerate(entries):
+                position = info["start"] + offset
+                if start_index is not None and position < start_index:
+                    continue
+                if end_index is not None and position >= end_index:
+                    return
+                t = entry.get("t", 0)
+                if start_time is not None and t < start_time:
+                    continue
+                if end_time is not None and t > end_time:
+                    continue
+                yield entry
+
+    @staticmethod
+    def read_segment_at(
+        index: int, *, scene: Optional[bpy.types.Scene] = None
+    ) -> Tuple[int, List[ActionLogEntry]]:
+        """
+        Decrypt the segment holding entry `index`.
+        Returns (index of the segment's first entry, its entries).
+        Raises IndexError if no stored segment holds the entry.
+        """
+        if scene is None:
+            scene = bpy.context.scene
+
+        text = TextData.get_text(SESSION_LOG_TEXT_NAME)
+        for info in SessionLogController.read_segment_index():
+            if info["start"] <= index < info["start"] + info["count"]:
+                cipher = SessionLogController.get_segment_cipher(scene)
+                entries = decode_segment(
+                    text.lines[info["line"]].body,
+                    cipher,
+                    expected_seq=info["seq"],
+                    expected_start=info["start"],
+                    line_index=info["line"],
+                )
+                return info["start"], entries
+
+        raise IndexError(f"No session log segment holds entry {index}")
+
+    @staticmethod
+    def _can_append(
+        text: bpy.types.Text,
+        raw_logs: List[ActionLogEntry],
+        checkpoints: List[Checkpoint],
+    ) -> bool:
+        """
+        Whether the Text already holds the first _log_persisted_count entries
+        of raw_logs as segments, and a prefix of checkpoints, so only the
+        remainder needs writing.
+        """
+        count = runtime._log_persisted_count
+        if count <= 0 or count > len(raw_logs):
+            return False
+        if runtime._log_persisted_tail != raw_logs[count - 1]:
+            return False
+
+        persisted = runtime._log_persisted_checkpoint
+        if persisted is not None:
+            position = persisted["index"]
+            if position >= len(checkpoints) or checkpoints[position] != persisted:
+                return False
+
+        return bool(text.lines) and is_segment_line(text.lines[0].body)
+
+    @staticmethod
+    def _mark_persisted(
+        raw_logs: List[ActionLogEntry],
+        segments: int,
+        checkpoints: Optional[List[Checkpoint]] = None,
+    ) -> None:
+        runtime._log_persisted_count = len(raw_logs)
+        runtime._log_persisted_segments = segments
+        runtime._log_persisted_tail = raw_logs[-1] if raw_logs else None
+        runtime._log_persisted_checkpoint = checkpoints[-1] if checkpoints else None
+
     # -------------------------------------------------------------------
     # SAVE RAW LOGS TO TEXT
     # -------------------------------------------------------------------
     @staticmethod
     def save_logs_to_text(
-        raw_logs: List[ActionLogEntry], *, scene: Optional[bpy.types.Scene] = None
-    ) -> None:
+        raw_logs: List[ActionLogEntry],
+        *,
+        scene: Optional[bpy.types.Scene] = None,
+        checkpoints: Optional[List[Checkpoint]] = None,
+    ) -> bool:
         """
-        Save _runtime_logs_raw to Text datablock following the flow:
-        json.dumps → zlib.compress → encrypt → base64 → write to Text
+        Save _runtime_logs_raw to the Text datablock as append-only segments.
+        Only entries added since the last save are encrypted and appended as a
+        new line, followed by any new checkpoint lines; the Text is rewritten
+        as a single segment when it does not hold a prefix of raw_logs
+        (legacy blob, reset or diverged log).
+
+        Runs plan_write → encode_write → apply_write on the calling thread;
+        see log_writer.py for the background version.
+        Returns whether anything was written.
         """
         print("[SessionLogController] save_logs_to_text() called")
+        job = SessionLogController.plan_write(
+            raw_logs, scene=scene, checkpoints=checkpoints
+        )
+        if job is None:
+            return False
+        lines = SessionLogController.encode_write(job)
+        return SessionLogController.apply_write(job, lines)
+
+    @staticmethod
+    def plan_write(
+        raw_logs: List[ActionLogEntry],
+        *,
+        scene: Optional[bpy.types.Scene] = None,
+        checkpoints: Optional[List[Checkpoint]] = None,
+    ) -> Optional[LogWrite]:
+        """
+        Main-thread half of a save: decide between appending and rewriting,
+        resolve the cipher and snapshot the entries and checkpoints to write.
+        Returns None when there is nothing new to write.
+        """
         if scene is None:
             scene = bpy.context.scene
 
         print(f"[SessionLogController] Total logs to save: {len(raw_logs)}")
 
-        # Step 1: Serialize JSON
-        serialized = json.dumps(raw_logs, separators=(",", ":"), ensure_ascii=False)
-        print(
-            f"[SessionLogController] Serialized logs size: {len(serialized.encode('utf-8'))} bytes"
-        )
-
-        # Step 2: Compress
-        compressed = zlib.compress(serialized.encode("utf-8"), level=5)
-        print(f"[SessionLogController] Compressed size: {len(compressed)} bytes")
-
-        # Step 3: Encrypt
-        salt_bytes = get_student_id_hash(scene).encode("utf-8")
-        key = get_teacher_double_hash(scene)
+        text = SessionLogController.ensure_session_text()
+        # Upgrades v1 scenes to a wrapped data key
+        cipher = SessionLogController.get_segment_cipher(scene, create=True)
+        checkpoints = [cp for cp in checkpoints or [] if cp["end"] <= len(raw_logs)]
+        persisted = runtime._log_persisted_checkpoint
+
+        job: LogWrite = {
+            "append": SessionLogController._can_append(text, raw_logs, checkpoints),
+            "scene": scene.name,
+            "cipher": cipher,
+            "base_count": runtime._log_persisted_count,
+            "base_segments": runtime._log_persisted_segments,
+            "base_checkpoint": persisted,
+            "start": 0,
+            "seq": 0,
+            "entries": [],
+            "checkpoints": checkpoints,
+            "count": len(raw_logs),
+            "tail": raw_logs[-1] if raw_logs else None,
+            "last_checkpoint": checkpoints[-1] if checkpoints else None,
+        }
+
+        if job["append"]:
+            job["start"] = runtime._log_persisted_count
+            job["seq"] = runtime._log_persisted_segments
+            job["checkpoints"] = checkpoints[persisted["index"] + 1 if persisted else 0 :]
+            if job["start"] == job["count"] and not job["checkpoints"]:
+                print("[SessionLogController] No new logs since last save")
+                return None
+
+        # The encoder slices an O(1) snapshot on the worker thread; spilled
+        # entries can only be read back here, on the main thread
+        if hasattr(raw_logs, "snapshot") and job["start"] >= raw_logs.spilled:
+            job["entries"] = raw_logs.snapshot()
+        else:
+            job["entries"] = raw_logs[:]
 
-        aes_key = fernet_key_from_string(key, salt_bytes)
-        cipher = Fernet(aes_key)
-        encrypted = cipher.encrypt(compressed)
+        return job
 
-        print(f"[SessionLogController] Encrypted size: {len(encrypted)} bytes")
+    @staticmethod
+    def encode_write(job: LogWrite) -> List[str]:
+        """
+        CPU-heavy half of a save: encode, compress and encrypt the planned
+        entries and checkpoints into Text lines. Does not touch bpy, so it
+        can run on a worker thread.
+        """
+        lines: List[str] = []
+        entries = job["entries"][job["start"] : job["count"]]
+        if entries or not job["append"]:
+            lines.append(
+                encode_segment(
+                    entries,
+                    job["seq"],
+                    job["start"],
+                    job["cipher"],
+                    level=runtime.LOG_COMPRESSION_LEVEL,
+                    use_dictionary=runtime.LOG_USE_DICTIONARY,
+                    binary=runtime.LOG_BINARY_ENCODING,
+                )
+            )
+        lines.extend(encode_checkpoint(cp, job["cipher"]) for cp in job["checkpoints"])
+        return lines
 
-        # Step 4: Base64 encode
-        b64_encoded = base64.b64encode(encrypted).decode("utf-8")
-        print(f"[SessionLogController] Base64 size: {len(b64_encoded)} chars")
+    @staticmethod
+    def apply_write(job: LogWrite, lines: List[str]) -> bool:
+        """
+        Main-thread half of a save: write the encoded lines into the Text.
+        Returns False, writing nothing, when the Text changed since the job
+        was planned (another save, a clear or a reload); plan again then.
+        """
+        if (
+            runtime._log_persisted_count != job["base_count"]
+            or runtime._log_persisted_segments != job["base_segments"]
+            or runtime._log_persisted_checkpoint != job["base_checkpoint"]
+        ):
+            print("[SessionLogController] Session log changed since the write was planned")
+            return False
 
-        # Step 5: Write to Text datablock
         text = SessionLogController.ensure_session_text()
-        TextData.write_text(text, b64_encoded, clear=True)
-        print("[SessionLogController] Logs successfully saved to Text datablock")
+        written = job["count"] - job["start"]
+        segments = job["seq"] + (1 if written or not job["append"] else 0)
+
+        if job["append"]:
+            if not text.lines or not is_segment_line(text.lines[0].body):
+                print("[SessionLogController] Session log changed since the write was planned")
+                return False
+            TextData.append_text(text, "\n" + "\n".join(lines))
+            print(
+                f"[SessionLogController] Appended {written} entries and {len(job['checkpoints'])} checkpoints"
+            )
+        else:
+            TextData.write_text(text, "\n".join(lines), clear=True)
+            scene = bpy.data.scenes.get(job["scene"])
+            if scene is not None:
+                scene[SCENE_LOG_FORMAT_VERSION] = LOG_FORMAT_V3
+            print(
+                f"[SessionLogController] Rewrote session log as one segment ({len(lines[0])} chars)"
+            )
+
+        runtime._log_persisted_count = job["count"]
+        runtime._log_persisted_segments = segments
+        runtime._log_persisted_tail = job["tail"]
+        runtime._log_persisted_checkpoint = job["last_checkpoint"]
+        return True
 
     # -------------------------------------------------------------------
     # LOAD LOGS FROM TEXT
@@ -139,8 +478,10 @@ class SessionLogController:
         *, scene: Optional[bpy.types.Scene] = None
     ) -> List[ActionLogEntry]:
         """
-        Load logs from Text datablock and reverse the flow:
+        Load logs from Text datablock. Segmented logs are decrypted segment by
+        segment in order; legacy single-blob logs reverse the flow:
         read → base64 decode → decrypt → decompress → json.loads
+        Stored checkpoints are loaded into runtime._log_checkpoints.
         """
         print("[SessionLogController] load_logs_from_text() called")
         if scene is None:
@@ -152,46 +493,95 @@ class SessionLogController:
             return []
 
         # Step 1: Read Text
-        b64_encoded = TextData.read_text(text)
-        print(
-            f"[SessionLogController] Read {len(b64_encoded)} chars from Text datablock"
-        )
+        content = TextData.read_text(text)
+        print(f"[SessionLogController] Read {len(content)} chars from Text datablock")
 
-        if not b64_encoded:
+        if not content.strip():
             print("[SessionLogController] Text datablock is empty")
+            SessionLogController._mark_persisted([], 0)
+            runtime._log_checkpoints[:] = []
             return []
 
         try:
-            # Step 2: Base64 decode
-            encrypted = base64.b64decode(b64_encoded)
-            print(f"[SessionLogController] Base64 decoded size: {len(encrypted)} bytes")
-
-            # Step 3: Decrypt
-            salt_bytes = get_student_id_hash(scene).encode("utf-8")
-            key = get_teacher_double_hash(scene)
-
-            aes_key = fernet_key_from_string(key, salt_bytes)
-            cipher = Fernet(aes_key)
-            compressed = cipher.decrypt(encrypted)
-
-            print(f"[SessionLogController] Decrypted size: {len(compressed)} bytes")
-
-            # Step 4: Decompress
-            serialized = zlib.decompress(compressed).decode("utf-8")
-            print(
-                f"[SessionLogController] Decompressed size: {len(serialized.encode('utf-8'))} bytes"
-            )
-
-            # Step 5: Deserialize JSON
-            raw_logs = json.loads(serialized)
+            if is_segment_line(content):
+                raw_logs, segments, checkpoints = SessionLogController._load_segments(
+                    content, scene
+                )
+                SessionLogController._mark_persisted(raw_logs, segments, checkpoints)
+            else:
+                raw_logs = SessionLogController._load_legacy_blob(content, scene)
+                checkpoints = []
+                # Force a full rewrite into segments on the next save
+                SessionLogController._mark_persisted([], 0)
+            runtime._log_checkpoints[:] = checkpoints
             print(f"[SessionLogController] Loaded {len(raw_logs)} logs successfully")
 
         except Exception as e:
             print(f"[SessionLogController][ERROR] Failed to load logs: {e}")
+            runtime._log_checkpoints[:] = []
             return []
 
         return raw_logs
 
+    @staticmethod
+    def _load_segments(content: str, scene: bpy.types.Scene):
+        cipher = SessionLogController.get_segment_cipher(scene)
+        raw_logs: List[ActionLogEntry] = []
+        checkpoints: List[Checkpoint] = []
+        segments = 0
+
+        for line_index, line in enumerate(content.split("\n")):
+            if not line.strip():
+                continue
+            if is_checkpoint_line(line):
+                checkpoints.append(decode_checkpoint(line, cipher, line_index))
+                continue
+            if not is_segment_line(line):
+                raise ValueError(f"Unknown log segment type in line {line_index}")
+
+            raw_logs.extend(
+                decode_segment(
+                    line,
+                    cipher,
+                    expected_seq=segments,
+                    expected_start=len(raw_logs),
+                    line_index=line_index,
+                )
+            )
+            segments += 1
+
+        broken = find_checkpoint_chain_break(checkpoints)
+        if broken is not None:
+            raise ValueError(f"Log checkpoint {broken} is out of order or not chained")
+        if checkpoints and checkpoints[-1]["end"] > len(raw_logs):
+            raise ValueError("Log checkpoints cover entries that are not stored")
+
+        print(
+            f"[SessionLogController] Decoded {segments} segments and {len(checkpoints)} checkpoints"
+        )
+        return raw_logs, segments, checkpoints
+
+    @staticmethod
+    def _load_legacy_blob(b64_encoded: str, scene: bpy.types.Scene):
+        # Step 2: Base64 decode
+        encrypted = base64.b64decode(b64_encoded)
+        print(f"[SessionLogController] Base64 decoded size: {len(encrypted)} bytes")
+
+        # Step 3: Decrypt
+        cipher = SessionLogController.get_v1_cipher(scene)
+        compressed = cipher.decrypt(encrypted)
+
+        print(f"[SessionLogController] Decrypted size: {len(compressed)} bytes")
+
+        # Step 4: Decompress
+        serialized = zlib.decompress(compressed).decode("utf-8")
+        print(
+            f"[SessionLogController] Decompressed size: {len(serialized.encode('utf-8'))} bytes"
+        )
+
+        # Step 5: Deserialize JSON
+        return json.loads(serialized)
+
     # -------------------------------------------------------------------
     # CLEAR LOGS
     # -------------------------------------------------------------------
@@ -199,6 +589,7 @@ class SessionLogController:
     def clear_logs() -> None:
         print("[SessionLogController] clear_logs() called")
         text = TextData.get_text(SESSION_LOG_TEXT_NAME)
+        SessionLogController._mark_persisted([], 0)
         if text:
             TextData.write_text(text, "", clear=True)
             print("[SessionLogController] Session logs cleared")
@@ -133,6 +133,28 @@ class TextData:
 
         print("[TextData] Write completed")
 
+    # ---------------------------------------------------------------------
+    # APPEND CONTENT TO TEXT
+    # ---------------------------------------------------------------------
+    @staticmethod
+    def append_text(text: Text, content: str) -> None:
+        print("[TextData] append_text() called")
+
+        if not isinstance(text, Text):
+            raise TypeError("Expected bpy.types.Text")
+
+        if not isinstance(content, str):
+            raise TypeError("Content must be a string")
+
+        print(f"[TextData] Appending to text: {text.name}")
+
+        # Move the cursor past the last character so write() appends
+        last_line = len(text.lines) - 1
+        text.cursor_set(last_line, character=len(text.lines[last_line].body))
+        text.write(content)
+
+        print("[TextData] Append completed")
+
     # ---------------------------------------------------------------------
     # READ CONTENT FROM TEXT
     # ---------------------------------------------------------------------
@@ -15,13 +15,16 @@ from ..core.crypto import (
     decrypt_metadata,
     encrypt_metadata,
 )
-from ..core.hash import compute_object_hash
+from ..core.hash import OBJECT_HASH_V1, OBJECT_HASH_VERSION, compute_object_hash
 from ..core.constants import (
     SCENE_TEACHER_DOUBLE_HASH,
     SCENE_ENCRYPTED_KEY,
     SCENE_SIGNATURE_VERSION,
     SCENE_STUDENT_ID_HASH,
     SCENE_SIGNATURE_MODE,
+    SCENE_LOG_WRAPPED_KEY,
+    SCENE_LOG_FORMAT_VERSION,
+    SCENE_PROJECT_ID,
 )
 
 from ..core.text.session_log_controller import SessionLogController
@@ -74,15 +77,18 @@ class SIGNATURE_OT_encrypt(bpy.types.Operator):
             # Geometry protection disabled → do NOT hash meshes
             objects = []
 
-        object_hashes = {
-            o.name: compute_object_hash(o) for o in objects if compute_object_hash(o)
-        }
+        object_hashes = {}
+        for o in objects:
+            object_hash = compute_object_hash(o, OBJECT_HASH_VERSION)
+            if object_hash:
+                object_hashes[o.name] = object_hash
 
         metadata = {
             "student_id": scene.student_id,
             "timestamp": timestamp,
             "object_hashes": object_hashes,
             "locked_objects": list(object_hashes.keys()),
+            "hash_version": OBJECT_HASH_VERSION,
         }
 
         hashed_student_id = hashlib.sha256(scene.student_id.encode()).hexdigest()
@@ -103,9 +109,14 @@ class SIGNATURE_OT_encrypt(bpy.types.Operator):
 
         scene[SCENE_ENCRYPTED_KEY] = encrypted_metadata
         scene[SCENE_SIGNATURE_VERSION] = 1
+        # Every student copy mints its own journal id on its first session
+        scene.pop(SCENE_PROJECT_ID, None)
         double_hash = hashlib.sha256(encryption_key.encode()).hexdigest()
         scene[SCENE_TEACHER_DOUBLE_HASH] = double_hash
 
+        # Random log data key, wrapped once under the derived key
+        SessionLogController.create_data_key(scene)
+
         genesis_key = generate_genesis_key(scene.teacher_key, scene.student_id)
         create_genesis_log(scene, genesis_key)
         save_logs_to_scene(scene)
@@ -170,13 +181,21 @@ class SIGNATURE_OT_decrypt(bpy.types.Operator):
 
         locked = set(metadata.get("locked_objects", []))
 
+        # Submissions signed before versioned hashes used v1
+        hash_version = metadata.get("hash_version", OBJECT_HASH_V1)
+
         # Verify hashes
-        tampered = any(
-            name not in bpy.data.objects
-            or compute_object_hash(bpy.data.objects[name]) != stored_hash
-            for name, stored_hash in metadata["object_hashes"].items()
-            if name in locked
-        )
+        try:
+            tampered = any(
+                name not in bpy.data.objects
+                or compute_object_hash(bpy.data.objects[name], hash_version)
+                != stored_hash
+                for name, stored_hash in metadata["object_hashes"].items()
+                if name in locked
+            )
+        except ValueError as e:
+            self.report({"ERROR"}, f"Cannot verify geometry: {e}")
+            return {"CANCELLED"}
 
         runtime._is_tampered = tampered
 
@@ -217,6 +236,9 @@ class SIGNATURE_OT_reset_submission(bpy.types.Operator):
         scene.pop(SCENE_STUDENT_ID_HASH, None)
         scene.pop(SCENE_TEACHER_DOUBLE_HASH, None)
         scene.pop(SCENE_SIGNATURE_MODE, None)
+        scene.pop(SCENE_LOG_WRAPPED_KEY, None)
+        scene.pop(SCENE_LOG_FORMAT_VERSION, None)
+        scene.pop(SCENE_PROJECT_ID, None)
         SessionLogController.clear_logs()
         runtime._runtime_metadata = None
         runtime.clear_runtime()
@@ -1,9 +1,8 @@
-import json
 import bpy  # type: ignore
 
 from bpy_extras.io_utils import ExportHelper  # type: ignore
 
-from ..core.logging import export_decrypted_logs
+from ..core.logging import export_decrypted_logs, write_export_json
 
 
 
@@ -28,7 +27,7 @@ class SIGNATURE_OT_export_logs(bpy.types.Operator, ExportHelper):
 
         try:
             with open(self.filepath, "w", encoding="utf-8") as f:
-                json.dump(exportData, f, indent=2)
+                write_export_json(exportData, f)
         except Exception as e:
             self.report({"ERROR"}, f"Failed to export logs: {e}")
             return {"CANCELLED"}